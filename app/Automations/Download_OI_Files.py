@@ -1,12 +1,20 @@
 import os
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
 from zipfile import ZipFile
 from datetime import datetime as dt
-from datetime import timedelta as td
+
+from requests import Session
 
 from Objects.Obj_ApiSpring import LoginError
 from Objects.Obj_ApiSpringBase import BaseClient
-from Objects.Obj_WebAutomation import Driver, WebDriver, sleep
+from Objects.Obj_DownloadWatcher import DownloadWatcher, wait_for_download
+from Objects.Obj_SessionDownload import (is_direct_url, session_from_webdriver,
+                                         stream_download)
+from Objects.Obj_WebAutomation import (Driver, DriverPool, TimeoutException,
+                                       WebDriver, WebElement, sleep, xpath)
 
 
 def mount_url(url_base: str, **kwargs) -> tuple[str, list]:
@@ -32,69 +40,89 @@ def mount_url(url_base: str, **kwargs) -> tuple[str, list]:
     return url_base + args, args.split("&")
 
 
-def _validacao_url(webdriver, oi_url, url_args) -> None:
+def _validacao_url(driver: Driver, webdriver: WebDriver, oi_url: str,
+                   url_args: list, tries: int = 10) -> None:
     """
     Validação de URL
 
     Args:
+        driver: The Driver object, where the waits are recorded.
         webdriver: The webdriver object.
         oi_url: The URL to validate.
+        url_args: The arguments that must be present in the current URL.
+        tries: How many times the URL is loaded again before giving up.
 
     Returns:
         None
     """
     # Validação de URL
-    while not all(arg in webdriver.current_url for arg in url_args):
-        # print([(arg, arg in webdriver.current_url) for arg in url_args])
-        sleep(5)
-        print("Aplicando filtros novamente...")
-        webdriver.get(oi_url)
+    for _ in range(tries):
+        try:
+            driver.wait_until(
+                webdriver,
+                lambda d: all(arg in d.current_url for arg in url_args),
+                timeout=5,
+                label='Filtros da URL')
+            return
+        except TimeoutException:
+            print("Aplicando filtros novamente...")
+            webdriver.get(oi_url)
+
+    raise TimeoutError('Filtros não aplicados na URL')
 
 
-def _verify_download(download_folder) -> None:
+def _verify_download(download_folder: str, watcher: DownloadWatcher = None,
+                     timeout: float = 180) -> str:
     """
-    Verify the completion of a download by checking the presence of temporary or partially downloaded files in the specified download folder.
+    Verify the completion of a download, waiting until no temporary or partially downloaded file is left and the ZIP file is present in the specified download folder.
 
     Args:
         download_folder (str): The path to the folder where the download is being made.
+        watcher (DownloadWatcher, optional): Watcher started before the download was triggered. Defaults to None, in which case a new one is started.
+        timeout (float, optional): Real deadline in seconds. Defaults to 180.
 
     Returns:
-        None: This function does not return anything. It prints a success message once the download is complete.
-    """
-    now = dt.now()
-    limit = now + td(minutes=3)
-
-    while any((f.endswith(('.crdownload', '.tmp')))
-              for f in os.listdir(download_folder)):
-        if now >= limit:
-            raise TimeoutError("Download inválido")
-
-        sleep(2)
+        str: The path of the downloaded ZIP file.
 
-    while not any(f.endswith('.zip')
-                  for f in os.listdir(download_folder)):
-        if now >= limit:
-            raise TimeoutError("Download inválido")
-        sleep(2)
+    Raises:
+        TimeoutError: If the download does not finish before the deadline.
+    """
+    if watcher:
+        zip_path = watcher.wait(timeout)
+    else:
+        zip_path = wait_for_download(download_folder, '.zip', timeout)
 
     print("Download realizado com sucesso!")
+    return zip_path
 
 
-def _extract_files(download_folder: str, format_exit: str) -> None:
+def _extract_files(download_folder: str, format_exit: str,
+                   zip_path: str = None, extract: bool = True) -> None:
     """
     Extracts the contents of a ZIP file in the specified download folder.
 
     Args:
         download_folder (str): The path to the folder where the ZIP file is located.
         format_exit (str): The format of the extracted files.
+        zip_path (str, optional): Extract only this ZIP file. Defaults to None (every ZIP in the folder).
+        extract (bool, optional): When False the ZIP is only renamed to `<format_exit>.zip`
+            and its members are read straight from the archive. Defaults to True.
 
     Returns:
         None: This function does not return anything. It prints a success message once the extraction is complete.
 
     """
-    for f in os.listdir(download_folder):
+    zip_files = ([os.path.basename(zip_path)] if zip_path
+                 else os.listdir(download_folder))
+
+    for f in zip_files:
         if f.endswith(".zip"):
             print(f"Arquivo ZIP encontrado: {f}")
+            if not extract:
+                os.replace(os.path.join(download_folder, f),
+                           os.path.join(download_folder, f'{format_exit}.zip'))
+                continue
+
             with ZipFile(os.path.join(download_folder, f), "r") as zip_ref:
                 new_folder = os.path.join(download_folder, format_exit)
                 if not os.path.exists(new_folder):
@@ -117,15 +145,69 @@ def _verify_do_auth(driver: Driver, webdriver: WebDriver) -> None:
         raise LoginError(f'Login inválido: {warning}')
 
 
+SAFE_SITES = ["https://portaloisolucoes.oi.com.br/"]
+
+# Origens cujos dados são limpos entre os logins de um navegador reutilizado
+PORTAL_ORIGINS = ["https://portaloisolucoes.oi.com.br",
+                  "https://autenticacao.oi.com.br"]
+
+
 def get_drivers(download_folder: str) -> tuple[Driver, WebDriver]:
     driver = Driver(download_folder=download_folder)
 
-    safe_sites = ["https://portaloisolucoes.oi.com.br/"]
-    webdriver = driver.new_driver(no_window=True, safe_sites=safe_sites)
+    webdriver = driver.new_driver(no_window=True, safe_sites=SAFE_SITES)
 
     return driver, webdriver
 
 
+def get_driver_pool(base_folder: str, size: int = 1) -> DriverPool:
+    """
+    Creates the pool of warm browsers used by the workers.
+
+    Args:
+        base_folder (str): Existing folder used as the initial download folder.
+        size (int, optional): Amount of browsers kept in the pool. Defaults to 1.
+
+    Returns:
+        DriverPool: The pool, recycling browsers after OI_POOL_MAX_USES leases
+            or when they pass OI_POOL_MAX_RSS_MB of resident memory.
+    """
+    return DriverPool(
+        base_folder,
+        size=size,
+        max_uses=int(os.getenv('OI_POOL_MAX_USES', 20)),
+        max_rss_mb=float(os.getenv('OI_POOL_MAX_RSS_MB', 1500)),
+        no_window=True,
+        safe_sites=SAFE_SITES,
+        clear_origins=PORTAL_ORIGINS)
+
+
+@contextmanager
+def open_drivers(download_folder: str,
+                 pool: DriverPool = None) -> Iterator[tuple[Driver, WebDriver]]:
+    """
+    Provides a browser for one attempt, leased from the pool when available.
+
+    Args:
+        download_folder (str): The folder that receives the downloads.
+        pool (DriverPool, optional): Pool of warm browsers. Defaults to None,
+            in which case a new browser is started and quit at the end.
+
+    Yields:
+        tuple[Driver, WebDriver]: The driver helper and its WebDriver.
+    """
+    if pool:
+        with pool.lease(download_folder) as drivers:
+            yield drivers
+        return
+
+    driver, webdriver = get_drivers(download_folder)
+    try:
+        yield driver, webdriver
+    finally:
+        webdriver.quit()
+
+
 def do_auth(driver: Driver, webdriver: WebDriver, login: BaseClient) -> None:
     webdriver.get('https://autenticacao.oi.com.br/nidp/saml2/sso?id=PortalOIContractCorp&sid=0&option=credential&sid=0')
 
@@ -144,8 +226,93 @@ def do_auth(driver: Driver, webdriver: WebDriver, login: BaseClient) -> None:
     _verify_do_auth(driver, webdriver)
 
 
-def down_oi(driver: Driver, webdriver: WebDriver,
-            download_folder, init_date: dt, final_date: dt, tipo_arquivo: str):
+TABLE_ROWS_XPATH = '//table/tbody/tr'
+HEADER_CHECKBOX_XPATH = '//table/thead/tr/th/input[@type="checkbox"]'
+
+
+def _first_row(driver: Driver, webdriver: WebDriver) -> WebElement:
+    return driver.find_by_element(webdriver, TABLE_ROWS_XPATH, wait=20)
+
+
+def _wait_page_change(driver: Driver, webdriver: WebDriver,
+                      old_row: WebElement) -> None:
+    """Waits until the table rows are re-rendered after a page change."""
+    old_text = old_row.text
+
+    def rows_rendered(d: WebDriver):
+        try:
+            if old_row.text == old_text:
+                return False
+        except Exception:  # StaleElementReferenceException
+            pass
+        return len(d.find_elements(xpath, TABLE_ROWS_XPATH)) > 0
+
+    driver.wait_until(webdriver, rows_rendered, timeout=30, label='Troca de página')
+
+
+def _select_page(driver: Driver, webdriver: WebDriver, tries: int = 3) -> None:
+    """
+    Selects every row of the current page and waits for the checkbox state.
+
+    The checkbox is only clicked while unselected: clicking again a page that
+    was just slow to update would unselect it. Click errors (element not yet
+    clickable, re-rendered or covered) are retried after a pause.
+    """
+    for _ in range(tries):
+        try:
+            checkbox = driver.find_by_element(webdriver, HEADER_CHECKBOX_XPATH, wait=20)
+            if not checkbox.is_selected():
+                checkbox = driver.click_by_element(webdriver, HEADER_CHECKBOX_XPATH, wait=20)
+
+            driver.wait_until(webdriver, lambda _: checkbox.is_selected(),
+                              timeout=10, label='Seleção da página')
+            return
+        except Exception as e:
+            print(f'Falha ao selecionar a página ({type(e).__name__}), tentando novamente...')
+            sleep(5)
+
+    raise TimeoutError('Não foi possível selecionar as faturas da página')
+
+
+def _print_progress(done: int, total: int | None) -> None:
+    if total:
+        print(f'\r{done / 1024 / 1024:.1f} de {total / 1024 / 1024:.1f}MB', end='')
+    else:
+        print(f'\r{done / 1024 / 1024:.1f}MB', end='')
+
+
+def _direct_download(session: Session, url: str | None,
+                     download_folder: str, tipo_arquivo: str,
+                     show_progress: bool = True) -> str | None:
+    """
+    Downloads the export over HTTP with the browser cookies, skipping Chrome's
+    download manager.
+
+    Runs in worker threads, so it gets the plain `href` of the link: the
+    WebDriver can't be used by several threads at once.
+
+    Returns:
+        str | None: The path of the ZIP file or None when the link can't be
+            fetched directly and the download must go through the browser.
+    """
+    if not is_direct_url(url):
+        return None
+
+    zip_path = os.path.join(download_folder, f'{tipo_arquivo}.zip')
+    try:
+        stream_download(session, url, zip_path,
+                        progress=_print_progress if show_progress else None)
+    except Exception as e:
+        print(f'\nDownload direto indisponível ({e}), usando o navegador...')
+        return None
+
+    print(f"\nDownload {tipo_arquivo} realizado com sucesso!")
+    return zip_path
+
+
+def _load_invoices(driver: Driver, webdriver: WebDriver,
+                   init_date: dt, final_date: dt) -> None:
+    """Loads the filtered invoice listing and selects every row of every page."""
     base_url = 'https://portaloisolucoes.oi.com.br/todas-as-contas?'
     limit = 30
     offset = 0
@@ -169,10 +336,14 @@ def down_oi(driver: Driver, webdriver: WebDriver,
         dueDateStart=inicio,
         dueDateEnd=fim)
 
-    sleep(5)
     webdriver.get(oi_url)
+    driver.wait_until(
+        webdriver,
+        lambda d: d.execute_script('return document.readyState') == 'complete',
+        timeout=30,
+        label='Carregamento inicial')
 
-    _validacao_url(webdriver, oi_url, url_args)
+    _validacao_url(driver, webdriver, oi_url, url_args)
 
     next_page_btn = driver.find_by_element(
         webdriver,
@@ -180,24 +351,19 @@ def down_oi(driver: Driver, webdriver: WebDriver,
         wait=10)
 
     while True:
-        try:
-            driver.click_by_element(webdriver,
-                                    '//table/thead/tr/th/input[@type="checkbox"]',
-                                    wait=20)
-
-        except Exception:
-            sleep(5)
-            driver.click_by_element(webdriver,
-                                    '//table/thead/tr/th/input[@type="checkbox"]',
-                                    wait=20)
+        _select_page(driver, webdriver)
 
         if 'disabled' not in webdriver.execute_script(
                 'return arguments[0].getAttributeNames()', next_page_btn):
+            first_row = _first_row(driver, webdriver)
             next_page_btn.click()
-            sleep(5)
+            _wait_page_change(driver, webdriver, first_row)
         else:
             break
 
+
+def _request_export(driver: Driver, webdriver: WebDriver, tipo_arquivo: str) -> None:
+    """Submits the export job of the selected invoices in the given format."""
     driver.click_by_element(webdriver,
                             '//button[@data-context="btn_baixar_barra_modal"]',
                             wait=5)
@@ -211,32 +377,125 @@ def down_oi(driver: Driver, webdriver: WebDriver,
         '//button[@data-context="btn_baixar"]'
     )
 
+
+def _wait_exports(driver: Driver, webdriver: WebDriver,
+                  tipos_arquivo: list[str]) -> dict[str, WebElement]:
+    """
+    Waits until the export rows of every format show "Disponível".
+
+    The newest exports are on the first rows of the downloads page, one
+    row per submitted job.
+
+    Returns:
+        dict[str, WebElement]: The download link of each format.
+    """
+    rows = len(tipos_arquivo)
+    xpaths = {
+        tipo: (f'(//tr[position() <= {rows}][td/a[@title="Baixar arquivo"]'
+               f' and td[2][contains(text(), "{tipo}")]'
+               ' and td[5]/p[text()="Disponível"]])[1]/td/a')
+        for tipo in tipos_arquivo
+    }
+
+    def all_available(d: WebDriver):
+        links = {}
+        for tipo, file_xpath in xpaths.items():
+            found = d.find_elements(xpath, file_xpath)
+            if not found or not found[0].is_enabled():
+                return False
+            links[tipo] = found[0]
+        return links
+
+    print('Esperando o processamento dos arquivos...')
+    try:
+        return driver.wait_until(webdriver, all_available,
+                                 timeout=80 * rows,
+                                 label=f'Exportação {"+".join(tipos_arquivo)}',
+                                 poll=1)
+    except TimeoutException:
+        raise FileNotFoundError('Arquivo não processado corretamente')
+
+
+def down_oi_exports(driver: Driver, webdriver: WebDriver, download_folder: str,
+                    init_date: dt, final_date: dt,
+                    tipos_arquivo: tuple[str, ...] = ('PDF', 'CSV'),
+                    direct: bool = None, extract: bool = None) -> None:
+    """
+    Selects the filtered invoices once, submits one export job per format and
+    downloads them all as `download_folder/<tipo>.zip`, or extracted into
+    `download_folder/<tipo>`.
+
+    Args:
+        driver (Driver): The driver helper.
+        webdriver (WebDriver): The authenticated WebDriver instance.
+        download_folder (str): The folder where the files are extracted.
+        init_date (dt): Start of the due date filter.
+        final_date (dt): End of the due date filter.
+        tipos_arquivo (tuple[str, ...], optional): Formats to export. Defaults to ('PDF', 'CSV').
+        direct (bool, optional): Fetch the files over HTTP with the browser
+            cookies. Defaults to the OI_DIRECT_DOWNLOAD variable (enabled).
+        extract (bool, optional): Extract the ZIP files to disk. Defaults to the
+            OI_EXTRACT_ZIP variable (disabled, the readers open the ZIP directly).
+    """
+    if direct is None:
+        direct = os.getenv('OI_DIRECT_DOWNLOAD', '1') == '1'
+
+    if extract is None:
+        extract = os.getenv('OI_EXTRACT_ZIP', '0') == '1'
+
+    _load_invoices(driver, webdriver, init_date, final_date)
+
+    for tipo_arquivo in tipos_arquivo:
+        try:
+            _request_export(driver, webdriver, tipo_arquivo)
+        except TimeoutException:
+            # A seleção foi perdida após a exportação anterior
+            _load_invoices(driver, webdriver, init_date, final_date)
+            _request_export(driver, webdriver, tipo_arquivo)
+
     driver.click_by_element(webdriver,
                             '//button[text() = "Ver downloads"]',
                             wait=10)
 
-    file_down_xpath = ('//tr[1][td/a[@title="Baixar arquivo"]'
-                       f' and td[2][contains(text(), "{tipo_arquivo}")]'
-                       ' and td[5]/p[text()="Disponível"]]/td/a')
+    links = _wait_exports(driver, webdriver, list(tipos_arquivo))
+    print("Arquivos concluídos com sucesso")
 
-    i = 0
-    tries = 15
-    print('Esperando o download do arquivo...')
-    while True:
-        try:
-            print(f'{i+1} de {tries}', end='... ')
-            driver.click_by_element(webdriver,
-                                    file_down_xpath)
-            print("Arquivo concluído com sucesso")
-            break
+    pending = list(tipos_arquivo)
+    if direct:
+        # Toda chamada ao WebDriver fica na thread principal
+        urls = {tipo: links[tipo].get_attribute('href') for tipo in tipos_arquivo}
+
+        with session_from_webdriver(webdriver) as session, \
+                ThreadPoolExecutor(max_workers=len(tipos_arquivo)) as executor:
+            downloaded = executor.map(
+                lambda tipo: _direct_download(session, urls[tipo], download_folder,
+                                              tipo, show_progress=len(tipos_arquivo) == 1),
+                tipos_arquivo)
+
+            for tipo_arquivo, zip_path in zip(tipos_arquivo, list(downloaded)):
+                if zip_path:
+                    _extract_files(download_folder, format_exit=tipo_arquivo,
+                                   zip_path=zip_path, extract=extract)
+                    pending.remove(tipo_arquivo)
+
+    for tipo_arquivo in pending:
+        with DownloadWatcher(download_folder, '.zip') as watcher:
+            links[tipo_arquivo].click()
+            zip_path = _verify_download(download_folder, watcher)
 
-        except BaseException:
-            if i < tries:
-                sleep(5)
-                i += 1
-            else:
-                raise FileNotFoundError('Arquivo não processado corretamente')
+        _extract_files(download_folder, format_exit=tipo_arquivo,
+                       zip_path=zip_path, extract=extract)
 
-    _verify_download(download_folder)
+    print('Esperas no portal:', driver.wait_report())
 
-    _extract_files(download_folder, format_exit=tipo_arquivo)
+
+def down_oi(driver: Driver, webdriver: WebDriver,
+            download_folder, init_date: dt, final_date: dt, tipo_arquivo: str,
+            direct: bool = None, extract: bool = None):
+    """
+    Exports and downloads the filtered invoices in a single format.
+
+    See `down_oi_exports` to export several formats in one visit.
+    """
+    down_oi_exports(driver, webdriver, download_folder, init_date, final_date,
+                    (tipo_arquivo,), direct, extract)
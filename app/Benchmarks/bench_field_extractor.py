@@ -0,0 +1,107 @@
+"""
+Micro-benchmark da extração de campos dos boletos OI: o laço antigo, que
+testa cada rótulo em cada linha, contra o FieldExtractor compilado.
+
+Uso (na pasta app):
+    python -m Benchmarks.bench_field_extractor
+"""
+from datetime import datetime as dt
+from timeit import repeat
+
+from Objects.Obj_Invoice import Invoice
+from Objects.Obj_Schema import MESREF_FORMAT
+from Readers.Leitor_Boleto_OI import FORMAT_2, FORMAT_3
+
+HEADER_2 = ("Contrato Agrupador: 99887766\nData de emissão: 03/02/2024\n"
+            "Referência\nFevereiro/2024\nFatura: 555\nValor a pagar\n88,90\n"
+            "Data de Vencimento\n15/02/2024\n")
+
+HEADER_3 = ("CHEGOU SUA FATURA DA OI\nEmissão em 01/02/2024\nFATURA DE\nx\n"
+            "fev/2024\nNÚMERO DO CLIENTE: 123\nNÚMERO DA FATURA: 0099\n"
+            "TOTAL A\nPAGAR (R$)\n1.234,56\nVENCIMENTO\nx\n10/02/2024\n")
+
+
+def _detail_page(page: int, lines: int = 60) -> str:
+    return '\n'.join(f'{page:03d}/{i:03d} LIGACAO LOCAL 2199999{i:04d} 00:01:12 0,12'
+                     for i in range(lines))
+
+
+def legacy_format_2(page_text: str, invoice: Invoice) -> None:
+    lines = page_text.split('\n')
+    for i, line in enumerate(lines):
+        if not invoice.emissao:
+            if 'Data de emissão' in line:
+                if 'Data de emissão:' in line:
+                    invoice.emissao = line.split()[-1].strip()
+        if not invoice.mesref:
+            if (rm_txt := 'Mês de referência:') in line:
+                invoice.mesref = dt.strptime(line.replace(rm_txt, '').strip(),
+                                             '%B %Y').strftime(MESREF_FORMAT)
+        if not invoice.mesref:
+            if 'Referência' == line:
+                invoice.mesref = dt.strptime(lines[i + 1], '%B/%Y').strftime(MESREF_FORMAT)
+        if not invoice.conta:
+            if (rm_txt := 'Contrato Agrupador:') in line:
+                invoice.conta = line.replace(rm_txt, '').strip()
+        if not invoice.fatura:
+            if 'Fatura: ' in line:
+                invoice.fatura = line.split()[-1].strip()
+        if not invoice.valor:
+            if 'Valor a pagar' in line:
+                invoice.valor = lines[i + 1]
+        if not invoice.vencimento:
+            if 'Data de Vencimento' in line:
+                invoice.vencimento = lines[i + 1]
+
+
+def legacy_format_3(page_text: str, invoice: Invoice) -> None:
+    lines = page_text.split('\n')
+    for i, line in enumerate(lines):
+        if not invoice.emissao:
+            if (rm_text := 'Emissão em ') in line:
+                invoice.emissao = line.removeprefix(rm_text).strip()
+        if not invoice.mesref:
+            if 'FATURA DE' in line:
+                invoice.mesref = dt.strptime(lines[i + 2], '%b/%Y').strftime(MESREF_FORMAT)
+        if not invoice.conta:
+            if (rm_txt := 'NÚMERO DO CLIENTE:') in line:
+                invoice.conta = line.removeprefix(rm_txt).strip()
+        if not invoice.fatura:
+            if (rm_txt := 'NÚMERO DA FATURA:') in line:
+                invoice.fatura = line.removeprefix(rm_txt).strip()
+        if not invoice.valor:
+            if 'PAGAR (R$)' in line:
+                invoice.valor = lines[i + 1]
+        if not invoice.vencimento:
+            if 'VENCIMENTO' in line:
+                invoice.vencimento = lines[i + 2]
+
+
+def _time(func, text: str, number: int) -> float:
+    best = min(repeat(lambda: func(text, Invoice()), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main() -> None:
+    cases = [
+        ('Layout 2', HEADER_2, legacy_format_2, FORMAT_2.extract),
+        ('Layout 3', HEADER_3, legacy_format_3, FORMAT_3.extract),
+    ]
+    print(f'{"Layout":<10}{"Páginas":>8}{"Antigo (µs)":>14}{"Novo (µs)":>12}{"Ganho":>8}')
+    for name, header, legacy, compiled in cases:
+        for pages in (1, 10, 50):
+            text = header + '\n'.join(_detail_page(p) for p in range(pages))
+
+            old, new = Invoice(), Invoice()
+            legacy(text, old)
+            compiled(text, new)
+            assert old.as_tuple() == new.as_tuple(), (old.as_tuple(), new.as_tuple())
+
+            number = max(10, 2000 // pages)
+            old_us = _time(legacy, text, number)
+            new_us = _time(compiled, text, number)
+            print(f'{name:<10}{pages:>8}{old_us:>14.1f}{new_us:>12.1f}{old_us / new_us:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark da montagem do DataFrame de faturas: um DataFrame de uma linha por
+PDF concatenado no laço (forma antiga) contra tuplas reunidas em um único
+DataFrame no final.
+
+Uso (na pasta app):
+    python -m Benchmarks.bench_invoice_records
+"""
+import tracemalloc
+from time import perf_counter
+
+import pandas as pd
+
+from Objects.Obj_Invoice import Invoice, invoices_dataframe
+from Objects.Obj_Schema import apply_invoice_schema
+
+
+def _invoice(n: int) -> Invoice:
+    invoice = Invoice(conta=f'{n:010d}', fatura=f'{n:012d}', valor='1.234,56',
+                      emissao='01/02/2024', vencimento='10/02/2024',
+                      arquivo=f'fatura_{n}.pdf', mesref='2024-02')
+    invoice.inicio_periodo = '01/01/2024'
+    invoice.fim_periodo = '31/01/2024'
+    invoice.boleto = '84600000001 2 34560000 0 12345678901 2 34567890123 4'
+    invoice.operadora = 'Oi'
+    invoice.path = 'PDF.zip'
+    invoice.full_path_file_pdf = f'PDF.zip::fatura_{n}.pdf'
+    invoice.tipo_leitura = 3
+    return invoice
+
+
+def legacy(invoices: list[Invoice]) -> pd.DataFrame:
+    main_df = pd.DataFrame()
+    for invoice in invoices:
+        data = {name: [getattr(invoice, name)] for name in Invoice.columns()}
+        main_df = pd.concat([main_df, pd.DataFrame.from_dict(data)])
+    main_df.reset_index(drop=True, inplace=True)
+    return main_df
+
+
+def batched(invoices: list[Invoice]) -> pd.DataFrame:
+    return invoices_dataframe(invoice.as_tuple() for invoice in invoices)
+
+
+def _measure(func, invoices: list[Invoice]) -> tuple[float, float]:
+    """Returns the best time (ms) of 3 runs and the peak traced memory (MB)."""
+    times = []
+    for _ in range(3):
+        start = perf_counter()
+        func(invoices)
+        times.append(perf_counter() - start)
+
+    tracemalloc.start()
+    func(invoices)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times) * 1000, peak / 1024 / 1024
+
+
+def main() -> None:
+    print(f'{"Faturas":>8}{"Antigo (ms)":>13}{"Novo (ms)":>11}{"Ganho":>8}'
+          f'{"Pico antigo (MB)":>18}{"Pico novo (MB)":>16}')
+    for total in (10, 100, 1000):
+        invoices = [_invoice(n) for n in range(total)]
+        pd.testing.assert_frame_equal(apply_invoice_schema(legacy(invoices)),
+                                      batched(invoices))
+
+        old_ms, old_mb = _measure(legacy, invoices)
+        new_ms, new_mb = _measure(batched, invoices)
+        print(f'{total:>8}{old_ms:>13.1f}{new_ms:>11.1f}{old_ms / new_ms:>7.1f}x'
+              f'{old_mb:>18.2f}{new_mb:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
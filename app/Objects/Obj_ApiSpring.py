@@ -1,10 +1,26 @@
 import os
+import json
+import random
 import dotenv
 import requests as req
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import perf_counter, sleep, time
 from typing import Literal
-from functools import cache
+from requests.adapters import HTTPAdapter
 
 from Objects.Obj_ApiSpringBase import BaseClient, BaseInvoice
+from Objects.Obj_DiskCache import DiskCache
+from Objects.Obj_Multipart import MultipartStream
+from Objects.Obj_TokenManager import TokenManager
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    # Dependência opcional, sem ela os logins não são guardados em cache
+    Fernet = None
+    InvalidToken = ValueError
 
 dotenv.load_dotenv()
 
@@ -26,20 +42,184 @@ class API_Spring_Error(Exception):
     pass
 
 
+# ------------------------------------------------- Requisições
+# Status repetidos com espera; POST só é repetido quando o servidor
+# recusou a requisição sem processá-la
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_STATUS_POST = (429, 503)
+
+# Tempo máximo de espera entre tentativas e do cabeçalho Retry-After
+MAX_BACKOFF = 30
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# ------------------------------------------------- Cache
+DEFAULT_API_CACHE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    '.cache', 'api_cache.sqlite')
+
+# Validade, em segundos, das respostas guardadas de cada endpoint
+CACHE_TTLS = {
+    'fornecedores': 24 * 60 * 60,
+    'logins': 60 * 60,
+    'accounts': 10 * 60,
+}
+
+# Endpoints com senhas na resposta, guardadas somente criptografadas
+SECRET_ENDPOINTS = ('logins',)
+
+DEFAULT_TOKEN_FOLDER = os.path.dirname(DEFAULT_API_CACHE)
+
+
+def cache_ttl(endpoint: str) -> float:
+    """Returns the TTL of an endpoint, env API_SPRING_TTL_<ENDPOINT> or CACHE_TTLS."""
+    return _env_float(f'API_SPRING_TTL_{endpoint.upper()}', CACHE_TTLS[endpoint])
+
+
+def _cache_fernet():
+    """Returns the Fernet of the key in API_SPRING_CACHE_KEY, or None when unavailable."""
+    key = os.getenv('API_SPRING_CACHE_KEY')
+    if Fernet is None or not key:
+        return None
+    return Fernet(key)
+
+
+def _retry_after(r: req.Response) -> float | None:
+    """Returns the wait asked by the server in the Retry-After header, in seconds."""
+    value = r.headers.get('Retry-After')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _file_positions(files, data=None) -> list[tuple]:
+    """Saves the position of the file-likes sent, so a retry sends them again whole."""
+    positions = []
+    if hasattr(data, 'seek') and hasattr(data, 'tell'):
+        positions.append((data, data.tell()))
+
+    if not files:
+        return positions
+
+    values = files.values() if isinstance(files, dict) else (v for _, v in files)
+    for value in values:
+        f = value[1] if isinstance(value, tuple) else value
+        if hasattr(f, 'seek') and hasattr(f, 'tell'):
+            positions.append((f, f.tell()))
+    return positions
+
+
+def latency_report(stats: dict[str, list]) -> str:
+    """
+    Formats the latency counters of the API requests.
+
+    Args:
+        stats (dict[str, list]): Endpoint -> [requests, total seconds, max seconds, errors].
+
+    Returns:
+        str: One line per endpoint, slowest total first.
+    """
+    lines = []
+    for endpoint, (count, total, longest, errors) in sorted(
+            stats.items(), key=lambda item: item[1][1], reverse=True):
+        lines.append(f'{endpoint}: {count} requisição(ões), {total:.1f}s no total, '
+                     f'média {total / count:.2f}s, máximo {longest:.2f}s, '
+                     f'{errors} erro(s)')
+    return '\n'.join(lines)
+
+
+def merge_latency(total: dict[str, list], stats: dict[str, list]) -> dict[str, list]:
+    """Adds the counters of `stats` (e.g. of another process) into `total`."""
+    for endpoint, (count, seconds, longest, errors) in stats.items():
+        current = total.setdefault(endpoint, [0, 0.0, 0.0, 0])
+        current[0] += count
+        current[1] += seconds
+        current[2] = max(current[2], longest)
+        current[3] += errors
+    return total
+
+
 # ------------------------------------------------- Classes
 class API_Spring:
-    _token = {}
-
-    def __init__(self, ambient: Literal['prod', 'hml']) -> None:
+    # Ambiente -> token compartilhado pelas instâncias e threads do processo
+    _tokens: dict[str, TokenManager] = {}
+    _tokens_lock = Lock()
+
+    # Sessão compartilhada pelas instâncias e threads do processo
+    _session: req.Session = None
+    _session_pid: int = None
+    _session_lock = Lock()
+
+    # Endpoint -> [requisições, segundos, máximo, erros]
+    _latency: dict[str, list] = {}
+    _latency_lock = Lock()
+
+    # Cache em disco das consultas, compartilhado no processo
+    _cache: DiskCache = None
+    _cache_pid: int = None
+    _cache_lock = Lock()
+    # Aviso de logins fora do cache, dado uma vez por processo
+    _secret_cache_warned = False
+
+    def __init__(self, ambient: Literal['prod', 'hml'], use_cache: bool = None) -> None:
+        """
+        Args:
+            ambient (Literal['prod', 'hml']): The API environment.
+            use_cache (bool, optional): Use the disk cache of fornecedores, logins
+                and accounts. Defaults to True unless the env API_SPRING_NO_CACHE is '1'.
+        """
         self.ambient = ambient
         self.__get_envs__()
 
-        if API_Spring._token.get(self.ambient, None):
-            self.token = API_Spring._token.get(self.ambient)
+        if use_cache is None:
+            use_cache = os.getenv('API_SPRING_NO_CACHE', '0') != '1'
+        self.use_cache = use_cache
 
-        else:
-            self.token = API_Spring._token.get(self.ambient) or self.get_token()
-            API_Spring._token[self.ambient] = self.token
+        self.timeout = (_env_float('API_SPRING_CONNECT_TIMEOUT', 10),
+                        _env_float('API_SPRING_READ_TIMEOUT', 120))
+        self.retries = int(_env_float('API_SPRING_RETRIES', 3))
+        self.backoff = _env_float('API_SPRING_BACKOFF', 1)
+
+    @property
+    def token(self) -> str:
+        """The bearer token of the ambient, refreshed before it expires."""
+        return self.tokens().get()
+
+    def tokens(self) -> TokenManager:
+        """
+        Returns the token manager of the ambient.
+
+        The token is refreshed API_SPRING_TOKEN_MARGIN seconds (default 60)
+        before its expiry. With API_SPRING_PERSIST_TOKEN=1 it is saved in
+        API_SPRING_TOKEN_FOLDER (default app/.cache) and reused by the other
+        processes and runs.
+        """
+        with API_Spring._tokens_lock:
+            manager = API_Spring._tokens.get(self.ambient)
+            if manager is None:
+                path = None
+                if os.getenv('API_SPRING_PERSIST_TOKEN', '0') == '1':
+                    folder = os.getenv('API_SPRING_TOKEN_FOLDER', DEFAULT_TOKEN_FOLDER)
+                    path = os.path.join(folder, f'token_{self.ambient}.json')
+
+                manager = TokenManager(self.get_token, path,
+                                       margin=_env_float('API_SPRING_TOKEN_MARGIN', 60))
+                API_Spring._tokens[self.ambient] = manager
+
+            return manager
 
     def __get_envs__(self) -> None:
         if self.ambient == 'hml':
@@ -69,6 +249,210 @@ class API_Spring:
                                '[hml | prod] sendo "hml" (homologação) ou '
                                '"prod" (produção).')
 
+    @classmethod
+    def session(cls) -> req.Session:
+        """
+        Returns the pooled keep-alive session of the current process.
+
+        A process started by fork gets a new session, the sockets of the
+        parent can't be shared.
+        """
+        with cls._session_lock:
+            if cls._session is None or cls._session_pid != os.getpid():
+                pool_size = int(_env_float('API_SPRING_POOL_SIZE', 10))
+                adapter = HTTPAdapter(pool_connections=pool_size,
+                                      pool_maxsize=pool_size)
+                session = req.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+
+                cls._session = session
+                cls._session_pid = os.getpid()
+
+            return cls._session
+
+    @classmethod
+    def disk_cache(cls) -> DiskCache | None:
+        """
+        Returns the disk cache of the current process.
+
+        The location comes from the env API_SPRING_CACHE ('0' disables the cache)
+        and the size limit, in MB, from API_SPRING_CACHE_MB.
+        """
+        path = os.getenv('API_SPRING_CACHE', DEFAULT_API_CACHE)
+        if path in ('', '0'):
+            return None
+
+        with cls._cache_lock:
+            if cls._cache is None or cls._cache_pid != os.getpid():
+                max_mb = _env_float('API_SPRING_CACHE_MB', 16)
+                cls._cache = DiskCache(path, max_bytes=int(max_mb * 1024 * 1024))
+                cls._cache_pid = os.getpid()
+
+            return cls._cache
+
+    @classmethod
+    def _warn_secret_cache(cls) -> None:
+        if cls._secret_cache_warned:
+            return
+
+        cls._secret_cache_warned = True
+        missing = ('cryptography não instalado' if Fernet is None
+                   else 'API_SPRING_CACHE_KEY não definida')
+        print(f'Cache dos logins desativado: {missing} (extra api-cache)')
+
+    def _cached_get(self, endpoint: str, url: str, headers: dict, params: dict) -> dict:
+        """
+        GETs a JSON response through the disk cache.
+
+        A fresh entry (see `cache_ttl`) is returned without a request. An
+        expired one is revalidated with If-None-Match / If-Modified-Since when
+        the server sent ETag / Last-Modified, and reused on 304. Responses of
+        SECRET_ENDPOINTS are stored encrypted with the key in
+        API_SPRING_CACHE_KEY (requires cryptography), and not stored without it.
+        """
+        cache = self.disk_cache() if self.use_cache else None
+        fernet = _cache_fernet() if endpoint in SECRET_ENDPOINTS else None
+        if cache is not None and endpoint in SECRET_ENDPOINTS and fernet is None:
+            self._warn_secret_cache()
+            cache = None
+        if cache is None:
+            return self._request('GET', endpoint, url, headers=headers, params=params).json()
+
+        key = f'{self.ambient}:{endpoint}:{json.dumps(params, sort_keys=True)}'
+        entry = cache.get_entry(key, cache_ttl(endpoint))
+
+        body = None
+        if entry is not None:
+            stored, fresh = entry
+            try:
+                body = (json.loads(fernet.decrypt(stored['body'].encode()))
+                        if fernet else stored['body'])
+            except InvalidToken:
+                # Chave trocada, a entrada é descartada
+                body = None
+
+            if fresh and body is not None:
+                return body
+
+            if body is not None:
+                headers = dict(headers)
+                if stored.get('etag'):
+                    headers['If-None-Match'] = stored['etag']
+                if stored.get('last_modified'):
+                    headers['If-Modified-Since'] = stored['last_modified']
+
+        r = self._request('GET', endpoint, url, headers=headers, params=params)
+        if r.status_code == 304 and body is not None:
+            cache.touch(key)
+            return body
+
+        data = r.json()
+        if r.status_code == 200:
+            cache.set(key, {
+                'body': fernet.encrypt(json.dumps(data).encode()).decode() if fernet else data,
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+            })
+        return data
+
+    @classmethod
+    def _record(cls, endpoint: str, seconds: float, error: bool) -> None:
+        with cls._latency_lock:
+            stats = cls._latency.setdefault(endpoint, [0, 0.0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+            stats[3] += int(error)
+
+    @classmethod
+    def latency_snapshot(cls, reset: bool = False) -> dict[str, list]:
+        """Returns a copy of the latency counters, see `latency_report`."""
+        with cls._latency_lock:
+            snapshot = {endpoint: list(stats) for endpoint, stats in cls._latency.items()}
+            if reset:
+                cls._latency.clear()
+        return snapshot
+
+    def _backoff(self, attempt: int) -> float:
+        # Espera exponencial com jitter completo
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt))
+
+    def _request(self, method: str, endpoint: str, url: str, **kwargs) -> req.Response:
+        """
+        Sends a request, see `_send`.
+
+        On a 401 the token sent is discarded and the request is sent once
+        more with a new token, e.g. when it was revoked before its expiry.
+        The files sent are rewound to where they were before the first attempt.
+        """
+        positions = _file_positions(kwargs.get('files'), kwargs.get('data'))
+        r = self._send(method, endpoint, url, positions, **kwargs)
+
+        headers = kwargs.get('headers') or {}
+        if r.status_code == 401 and headers.get('Authorization'):
+            print(f'{endpoint}: token recusado, renovando')
+            r.close()
+            self.tokens().invalidate(headers['Authorization'])
+            kwargs['headers'] = {**headers, 'Authorization': self.token}
+            r = self._send(method, endpoint, url, positions, **kwargs)
+
+        return r
+
+    def _send(self, method: str, endpoint: str, url: str, positions: list[tuple],
+              **kwargs) -> req.Response:
+        """
+        Sends a request through the shared session, with timeout and retries.
+
+        GET is retried on connection errors, timeouts and RETRY_STATUS. POST is
+        retried only when it surely wasn't processed: connect timeouts and
+        RETRY_STATUS_POST. The Retry-After header is honoured, and the files
+        sent are rewound before each attempt.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): Name of the endpoint in the latency counters.
+            url (str): The URL of the request.
+            positions (list[tuple]): (file, position) of the files sent, see
+                `_file_positions`, restored before each attempt.
+            **kwargs: Passed to `requests.Session.request`.
+
+        Returns:
+            req.Response: The last response received.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        retry_status = RETRY_STATUS if method == 'GET' else RETRY_STATUS_POST
+
+        for attempt in range(self.retries + 1):
+            for f, position in positions:
+                f.seek(position)
+
+            start = perf_counter()
+            try:
+                r = self.session().request(method, url, **kwargs)
+
+            except (req.exceptions.ConnectionError, req.exceptions.Timeout) as e:
+                self._record(endpoint, perf_counter() - start, error=True)
+                retryable = (method == 'GET'
+                             or isinstance(e, req.exceptions.ConnectTimeout))
+                if not retryable or attempt == self.retries:
+                    raise
+
+                delay = self._backoff(attempt)
+                print(f'{endpoint}: {type(e).__name__}, nova tentativa em {delay:.1f}s')
+                sleep(delay)
+                continue
+
+            self._record(endpoint, perf_counter() - start, error=r.status_code >= 400)
+            if r.status_code not in retry_status or attempt == self.retries:
+                return r
+
+            delay = _retry_after(r)
+            delay = self._backoff(attempt) if delay is None else min(delay, MAX_BACKOFF)
+            print(f'{endpoint}: status {r.status_code}, nova tentativa em {delay:.1f}s')
+            r.close()
+            sleep(delay)
+
     def get_logins(self, fornecedor_id: str = None, cliente_id: str = None) -> dict:
         url = self.end_logins
         headers = {}
@@ -82,9 +466,7 @@ class API_Spring:
         if cliente_id:
             params['clienteId'] = cliente_id
 
-        r = req.get(url, headers=headers, params=params)
-
-        return r.json()
+        return self._cached_get('logins', url, headers, params)
 
     def get_fornecedores_by_name(self, name: str) -> list:
         url = self.end_get_fornecedores_id
@@ -94,14 +476,15 @@ class API_Spring:
         params = {}
         params['NomeFantasia'] = name
 
-        r = req.get(url, headers=headers, params=params)
+        data = self._cached_get('fornecedores', url, headers, params)
 
-        return [(x['id'], x['clienteAdmId']) for x in r.json()['data']]
+        return [(x['id'], x['clienteAdmId']) for x in data['data']]
 
-    @cache
     def get_token(self) -> str:
         """
-        Retrieves the bearer token for the specified email and password.
+        Logs in and retrieves a new bearer token for the specified email and password.
+
+        Use `token` instead, it reuses the token until it is about to expire.
 
         Args:
             self (API_Spring): The API_Spring instance.
@@ -113,7 +496,7 @@ class API_Spring:
             LoginError: If there was an error during the login process.
         """
 
-        r = req.post(self.end_token, json={
+        r = self._request('POST', 'token', self.end_token, json={
             'email': self.email,
             'password': self.password
         })
@@ -132,48 +515,116 @@ class API_Spring:
         params = {}
         params['ClienteId'] = client.cliente_id
 
-        r = req.get(url, headers=headers, params=params)
+        return self._cached_get('accounts', url, headers, params)
 
-        return r.json()
-
-    def up_invoice(self, payload: dict, files: list[tuple]) -> None:
+    def up_invoice_file(self, payload: dict, file: tuple) -> None:
         """
-        Uploads an invoice to the API using the provided payload and files.
+        Uploads one file of an invoice, PDF or detail, in its own request.
+
+        A file given by its path is opened only while it is sent, and the
+        multipart body is streamed in chunks (see `MultipartStream`).
 
         Args:
             payload (dict): The payload containing the invoice data.
-            files (dict): The files to be uploaded along with the invoice.
+            file (tuple): (file name, full path or file object, content type).
 
         Raises:
-            TypeError: If an invalid or unknown file type is found.
-            req.exceptions.ContentDecodingError: If a file is too large to be sent.
+            req.exceptions.ContentDecodingError: If the file is too large to be sent.
             req.exceptions.RequestException: If there is an error during the upload process.
         """
         url = self.end_up_invoice
         headers = {}
         headers['Authorization'] = self.token
 
+        f = {'files': file}
+        temp_payload = payload.copy()
+
+        if file[0] == temp_payload['ArquivoAzurePdf']:
+            temp_payload['ArquivoAzureDigital'] = None
+            temp_payload['NomeArquivoDigital'] = None
+        else:
+            temp_payload['ArquivoAzurePdf'] = None
+            temp_payload['NomeArquivoPdf'] = None
+
+        if isinstance(file[1], str):
+            with MultipartStream(temp_payload, [('files', *file)]) as body:
+                headers['Content-Type'] = body.content_type
+                r = self._request('POST', 'up_invoice', url, headers=headers, data=body)
+        else:
+            r = self._request('POST', 'up_invoice', url, headers=headers,
+                              data=temp_payload, files=f)
+
+        if r.status_code == 200:
+            print(f'Arquivo {f.get("files")[0]} enviado com sucesso.')
+        elif r.status_code == 413:
+            raise req.exceptions.ContentDecodingError(f'{file[0]}: Arquivo muito grande para ser enviado.')
+        elif r.status_code != 200:
+            raise req.exceptions.RequestException(f'Erro [{r.status_code}]: {r.text}')
+
+    def up_invoice(self, payload: dict, files: list[tuple]) -> None:
+        """
+        Uploads an invoice to the API using the provided payload and files.
+
+        The files are sent in order, one request each, stopping at the first error.
+
+        Args:
+            payload (dict): The payload containing the invoice data.
+            files (list[tuple]): The files to be uploaded along with the invoice.
+
+        Raises:
+            req.exceptions.ContentDecodingError: If a file is too large to be sent.
+            req.exceptions.RequestException: If there is an error during the upload process.
+        """
         for file in files:
-            f = {'files': file}
-            temp_payload = payload.copy()
-
-            if file[0] == temp_payload['ArquivoAzurePdf']:
-                temp_payload['ArquivoAzureDigital'] = None
-                temp_payload['NomeArquivoDigital'] = None
-            else:
-                temp_payload['ArquivoAzurePdf'] = None
-                temp_payload['NomeArquivoPdf'] = None
-
-            r = req.post(url, headers=headers, data=temp_payload, files=f)
-
-            if r.status_code == 200:
-                print(f'Arquivo {f.get("files")[0]} enviado com sucesso.')
-            elif r.status_code == 413:
-                raise req.exceptions.ContentDecodingError(f'{file[0]}: Arquivo muito grande para ser enviado.')
-            elif r.status_code != 200:
-                raise req.exceptions.RequestException(f'Erro [{r.status_code}]: {r.text}')
+            self.up_invoice_file(payload, file)
         print('Fatura enviada com sucesso.')
 
+    def _up_invoice_result(self, payload: dict, files: list[tuple]) -> dict:
+        start = perf_counter()
+        result = {
+            'conta': payload.get('NumeroConta'),
+            'arquivo': payload.get('NomeArquivoPdf'),
+            'status': 'success',
+            'error': None,
+        }
+        try:
+            self.up_invoice(payload, files)
+        except Exception as e:
+            result['status'] = 'error'
+            result['error'] = f'{type(e).__name__}: {e}'
+
+        result['elapsed'] = perf_counter() - start
+        return result
+
+    def up_invoices(self, invoices: list[tuple[dict, list[tuple]]],
+                    max_in_flight: int = None) -> list[dict]:
+        """
+        Uploads several invoices concurrently, see `up_invoice`.
+
+        The files of each invoice are still sent in order, so at most
+        `max_in_flight` requests are open at a time. An error stops only the
+        invoice it happened in.
+
+        Args:
+            invoices (list[tuple[dict, list[tuple]]]): Payload and files of each invoice.
+            max_in_flight (int, optional): Invoices uploaded at the same time.
+                Defaults to the env API_SPRING_MAX_IN_FLIGHT or 4.
+
+        Returns:
+            list[dict]: One result per invoice, in the given order, with conta,
+                arquivo, status ('success' | 'error'), error and elapsed.
+        """
+        if not invoices:
+            return []
+
+        max_in_flight = max_in_flight or int(_env_float('API_SPRING_MAX_IN_FLIGHT', 4))
+        max_in_flight = max(1, min(max_in_flight, len(invoices)))
+
+        payloads = [payload for payload, _ in invoices]
+        files = [files for _, files in invoices]
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            return list(executor.map(self._up_invoice_result, payloads, files))
+
     def send_error_log(self, title: str, message: str, stacktrace: str,
                        origin: str, status: Literal['warning', 'error', 'info', 'success'] = 'error',
                        login_id: int = 1, login_create_id: int = None,
@@ -193,7 +644,7 @@ class API_Spring:
             'cliente_adm_id': cliente_adm_id
         }
 
-        r = req.post(url, headers=headers, json=payload)
+        r = self._request('POST', 'error_log', url, headers=headers, json=payload)
 
         if r.status_code == 200:
             print('Log enviado com sucesso!')
@@ -202,9 +653,29 @@ class API_Spring:
             raise UploadError(f'Erro [{r.status_code}]: {r.text}')
 
 
+def _fetch_workers(total: int) -> int:
+    workers = int(_env_float('API_SPRING_FETCH_WORKERS', 8))
+    return max(1, min(workers, total))
+
+
 def filter_logins(api: API_Spring, logins: dict, fornecedores_ids: list[int]) -> list[BaseClient]:
-    filtered_accounts: list[str] = []
+    """
+    Creates the valid logins with their accounts of the given fornecedores.
+
+    The accounts of all logins are fetched concurrently, then deduplicated in
+    the order of `logins`: an account already seen stays with the first login.
+
+    Args:
+        api (API_Spring): The API client.
+        logins (dict): The logins returned by the API.
+        fornecedores_ids (list[int]): Fornecedores whose accounts are kept.
+
+    Returns:
+        list[BaseClient]: The logins, in the given order.
+    """
+    filtered_accounts: set[str] = set()
     filtered_logins: list[BaseClient] = []
+    fornecedores_ids = set(fornecedores_ids)
 
     assert len(logins) > 0, 'Nenhum login encontrado.'
     for login in logins:
@@ -218,11 +689,17 @@ def filter_logins(api: API_Spring, logins: dict, fornecedores_ids: list[int]) ->
         if login['login'] in ['00000000000', '000.000.000.00']:
             continue
 
-        client = BaseClient(login)
-        accounts = []
-        accounts = api.get_accounts(client)['data']
+        filtered_logins.append(BaseClient(login))
+
+    if not filtered_logins:
+        return filtered_logins
 
-        for account in accounts:
+    with ThreadPoolExecutor(max_workers=_fetch_workers(len(filtered_logins))) as executor:
+        # map mantém a ordem dos logins, a primeira conta encontrada vence
+        all_accounts = list(executor.map(api.get_accounts, filtered_logins))
+
+    for client, accounts in zip(filtered_logins, all_accounts):
+        for account in accounts['data']:
             obj_account = BaseInvoice(account)
             if obj_account.numero_conta in filtered_accounts:
                 continue
@@ -231,14 +708,13 @@ def filter_logins(api: API_Spring, logins: dict, fornecedores_ids: list[int]) ->
                 continue
 
             client.contas.append(obj_account)
-            filtered_accounts.append(obj_account.numero_conta)
-
-        filtered_logins.append(client)
+            filtered_accounts.add(obj_account.numero_conta)
 
     return filtered_logins
 
 
-def get_logins(name: str, ambient: Literal['prod', 'hml'] = 'prod') -> list[BaseClient]:
+def get_logins(name: str, ambient: Literal['prod', 'hml'] = 'prod',
+               use_cache: bool = None) -> list[BaseClient]:
     """
     Retrieves all logins for the given ambient (environment) and filters out
     invalid logins.
@@ -246,26 +722,35 @@ def get_logins(name: str, ambient: Literal['prod', 'hml'] = 'prod') -> list[Base
     Args:
         ambient (Literal['prod', 'hml'], optional): The ambient to retrieve
             logins from. Defaults to 'prod'.
+        use_cache (bool, optional): Use the disk cache of the API, see `API_Spring`.
 
     Returns:
-        list: A list of filtered logins.
+        list: A list of filtered logins, ordered by client id.
     """
 
-    api = API_Spring(ambient)
+    api = API_Spring(ambient, use_cache)
     fornecedores_ids = api.get_fornecedores_by_name(name)
-    logins = []
-    list_clientes_ids = list(set([x for _, x in fornecedores_ids]))
-    list_fornecedores_ids = list(set([x for x, _ in fornecedores_ids]))
-    for cliente_id in list_clientes_ids:
-        new_logins = []
-        all_logins = api.get_logins(cliente_id=cliente_id)['data']
-        for login in all_logins:
-            if login['fornecedorId'] in list_fornecedores_ids:
-                new_logins.append(login)
+    # Ordem fixa para a deduplicação das contas, clientes sem id por último
+    list_clientes_ids = sorted({x for _, x in fornecedores_ids},
+                               key=lambda x: (x is None, x or 0))
+    list_fornecedores_ids = {x for x, _ in fornecedores_ids}
 
-        logins.extend(new_logins)
+    def client_logins(cliente_id) -> list[dict]:
+        return api.get_logins(cliente_id=cliente_id)['data']
+
+    logins = []
+    if list_clientes_ids:
+        with ThreadPoolExecutor(max_workers=_fetch_workers(len(list_clientes_ids))) as executor:
+            for all_logins in executor.map(client_logins, list_clientes_ids):
+                logins.extend(login for login in all_logins
+                              if login['fornecedorId'] in list_fornecedores_ids)
 
     logins = filter_logins(api, logins, list_fornecedores_ids)
+
+    cache = api.disk_cache() if api.use_cache else None
+    if cache is not None:
+        print(f'Cache da API Spring: {cache.stats()}')
+
     return logins
 
 
@@ -0,0 +1,118 @@
+import json
+import os
+import sqlite3
+from threading import Lock
+from time import time
+
+
+class DiskCache:
+    """Cache persistente em SQLite com limite de tamanho e descarte LRU"""
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Args:
+            path (str): The SQLite file, created along with its folder when missing.
+            max_bytes (int, optional): Size limit of the stored values; the least
+                recently used entries are evicted above it. Defaults to 64MB.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+        # Vários processos trabalhadores usam o mesmo arquivo
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' created REAL NOT NULL,'
+                ' last_used REAL NOT NULL)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)')
+
+    def get_entry(self, key: str, max_age: float = None) -> tuple[object, bool] | None:
+        """
+        Returns the cached value and whether it is fresh, i.e. not older than
+        `max_age` seconds, or None when missing.
+
+        Stale values are still returned, e.g. for a conditional refresh, but
+        only fresh ones count as a hit.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created FROM entries WHERE key = ?', (key,)).fetchone()
+
+            fresh = row is not None and (max_age is None or time() - row[1] <= max_age)
+            if not fresh:
+                self.misses += 1
+                if row is None:
+                    return None
+            else:
+                with self._conn:
+                    self._conn.execute('UPDATE entries SET last_used = ? WHERE key = ?',
+                                       (time(), key))
+                self.hits += 1
+
+        return json.loads(row[0]), fresh
+
+    def get(self, key: str, max_age: float = None):
+        """
+        Returns the cached value, or None when missing or older than `max_age` seconds.
+        """
+        entry = self.get_entry(key, max_age)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    def set(self, key: str, value) -> None:
+        """Stores a JSON serializable value and evicts old entries above the size limit."""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, created, last_used)'
+                ' VALUES (?, ?, ?, ?, ?)', (key, data, len(data), now, now))
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        """Marks an entry as freshly created, e.g. after the source confirms it is unchanged."""
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE entries SET created = ?, last_used = ? WHERE key = ?',
+                               (time(), time(), key))
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def _evict(self) -> None:
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Libera até 90% do limite para não descartar a cada nova entrada
+        target = total - self.max_bytes * 0.9
+        freed = 0
+        keys = []
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM entries ORDER BY last_used'):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+
+        self._conn.executemany('DELETE FROM entries WHERE key = ?', keys)
+
+    def stats(self) -> str:
+        return f'{self.hits} acerto(s), {self.misses} falha(s)'
+
+    def close(self) -> None:
+        self._conn.close()
@@ -0,0 +1,177 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from time import monotonic, sleep
+
+# Eventos do inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+_EVENT_HEADER = struct.Struct('iIII')
+_ADDED = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE
+_REMOVED = IN_DELETE | IN_MOVED_FROM
+
+PARTIAL_SUFFIXES = ('.crdownload', '.tmp')
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+def _completed(files: set[str], suffix: str, ignore: set[str]) -> str | None:
+    if any(f.endswith(PARTIAL_SUFFIXES) for f in files):
+        return None
+
+    return next((f for f in sorted(files - ignore) if f.endswith(suffix)), None)
+
+
+class DownloadWatcher:
+    """Espera um download terminar usando eventos do inotify ou, na falta dele, polling"""
+
+    def __init__(self, folder: str, suffix: str = '.zip',
+                 poll_interval: float = 1, ignore_existing: bool = True) -> None:
+        """
+        Args:
+            folder (str): The folder where the browser writes the download.
+            suffix (str, optional): Suffix of the finished file. Defaults to '.zip'.
+            poll_interval (float, optional): Interval of the polling fallback in seconds.
+            ignore_existing (bool, optional): Ignore finished files already in the
+                folder when the watch starts. Defaults to True.
+        """
+        self.folder = folder
+        self.suffix = suffix
+        self.poll_interval = poll_interval
+        self.ignore_existing = ignore_existing
+        self._ignore: set[str] = set()
+        self._fd = None
+
+    def __enter__(self) -> 'DownloadWatcher':
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Starts watching the folder; call it before triggering the download."""
+        if self._fd is not None:
+            return
+
+        if self.ignore_existing:
+            self._ignore = set(os.listdir(self.folder))
+
+        if _libc is None:
+            return
+
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return
+
+        mask = _ADDED | _REMOVED
+        if _libc.inotify_add_watch(fd, os.fsencode(self.folder), mask) < 0:
+            os.close(fd)
+            return
+
+        self._fd = fd
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._ignore = set()
+
+    def wait(self, timeout: float = 180) -> str:
+        """
+        Blocks until no partial file is left and the finished file exists.
+
+        Args:
+            timeout (float, optional): Deadline in seconds. Defaults to 180.
+
+        Returns:
+            str: The full path of the finished file.
+
+        Raises:
+            TimeoutError: If the download does not finish before the deadline.
+        """
+        deadline = monotonic() + timeout
+        if self._fd is not None:
+            found = self._wait_events(deadline)
+        else:
+            found = self._wait_polling(deadline)
+
+        if not found:
+            raise TimeoutError("Download inválido")
+
+        return os.path.join(self.folder, found)
+
+    def _wait_events(self, deadline: float) -> str | None:
+        files = set(os.listdir(self.folder))
+        while not (found := _completed(files, self.suffix, self._ignore)):
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return None
+
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                continue
+
+            buffer = os.read(self._fd, 64 * 1024)
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+                offset += length
+
+                if mask & _REMOVED:
+                    files.discard(name)
+                elif mask & _ADDED:
+                    files.add(name)
+
+        return found
+
+    def _wait_polling(self, deadline: float) -> str | None:
+        while not (found := _completed(set(os.listdir(self.folder)),
+                                       self.suffix, self._ignore)):
+            if monotonic() >= deadline:
+                return None
+            sleep(self.poll_interval)
+
+        return found
+
+
+def wait_for_download(folder: str, suffix: str = '.zip',
+                      timeout: float = 180) -> str:
+    """
+    Waits for a download that was already triggered to finish.
+
+    Prefer using `DownloadWatcher` as a context manager around the click,
+    so no event is lost between the click and the start of the watch.
+
+    Args:
+        folder (str): The folder where the browser writes the download.
+        suffix (str, optional): Suffix of the finished file. Defaults to '.zip'.
+        timeout (float, optional): Deadline in seconds. Defaults to 180.
+
+    Returns:
+        str: The full path of the finished file.
+    """
+    with DownloadWatcher(folder, suffix, ignore_existing=False) as watcher:
+        return watcher.wait(timeout)
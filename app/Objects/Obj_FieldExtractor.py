@@ -0,0 +1,130 @@
+import re
+from typing import Callable
+
+# Formas de obter o valor de um campo a partir da linha do rótulo
+LINE = 'line'                  # lines[i + offset] inteira
+LAST_WORD = 'last_word'        # última palavra da linha
+REPLACE = 'replace'            # linha sem o rótulo (em qualquer posição)
+REMOVEPREFIX = 'removeprefix'  # linha sem o rótulo no início
+
+
+class FieldSpec:
+    """Descreve onde um campo é encontrado no texto de um layout de PDF"""
+
+    def __init__(self, field: str, anchor: str, value: str | Callable = LINE,
+                 offset: int = 0, whole_line: bool = False,
+                 convert: Callable[[str], str] = None) -> None:
+        """
+        Args:
+            field (str): Attribute filled on the target object.
+            anchor (str): Literal text that identifies the line of the field.
+            value (str | Callable, optional): LINE, LAST_WORD, REPLACE, REMOVEPREFIX or a
+                callable `(lines, i) -> value` for layouts that need custom logic.
+            offset (int, optional): Line, relative to the anchor, read by LINE, or the
+                last line read by the callable. Defaults to 0.
+            whole_line (bool, optional): The anchor must be the whole line. Defaults to False.
+            convert (Callable[[str], str], optional): Applied to the value found.
+        """
+        self.field = field
+        self.anchor = anchor
+        self.value = value
+        self.offset = offset
+        self.whole_line = whole_line
+        self.convert = convert
+
+    def read(self, lines: list[str], i: int):
+        line = lines[i]
+        match self.value:
+            case 'line':
+                value = lines[i + self.offset]
+            case 'last_word':
+                value = line.split()[-1].strip()
+            case 'replace':
+                value = line.replace(self.anchor, '').strip()
+            case 'removeprefix':
+                value = line.removeprefix(self.anchor).strip()
+            case _:
+                value = self.value(lines, i)
+
+        if value and self.convert:
+            value = self.convert(value)
+        return value
+
+
+class FieldExtractor:
+    """
+    Compila os rótulos de um layout em uma única expressão regular,
+    preenchendo todos os campos com uma só passada pelo texto.
+    """
+
+    def __init__(self, specs: list[FieldSpec],
+                 after: Callable[[object], None] = None) -> None:
+        """
+        Args:
+            specs (list[FieldSpec]): The fields of the layout. When a field has more
+                than one spec, the first one found in the text wins.
+            after (Callable[[object], None], optional): Fills derived fields once the
+                scan is done, e.g. a reference month taken from the issue date.
+        """
+        self.specs = specs
+        self.after = after
+        self.fields = list(dict.fromkeys(spec.field for spec in specs))
+
+        self._by_anchor: dict[str, list[FieldSpec]] = {}
+        for spec in specs:
+            self._by_anchor.setdefault(spec.anchor, []).append(spec)
+
+        # Sem grupos nomeados o re consegue pular as posições que não
+        # começam com a primeira letra de algum rótulo
+        anchors = sorted(self._by_anchor, key=len, reverse=True)
+        self._regex = re.compile('|'.join(re.escape(anchor) for anchor in anchors))
+
+    @staticmethod
+    def _window(text: str, pos: int, depth: int) -> list[str]:
+        """Returns the line at `pos` and up to `depth` following lines."""
+        start = text.rfind('\n', 0, pos) + 1
+        end = start
+        for _ in range(depth + 1):
+            end = text.find('\n', end)
+            if end == -1:
+                return text[start:].split('\n')
+            end += 1
+
+        return text[start:end - 1].split('\n')
+
+    def extract(self, text: str, target) -> None:
+        """
+        Fills the empty fields of `target` with the first value found for each.
+
+        Args:
+            text (str): The text of the PDF.
+            target (object): Object whose attributes receive the values.
+
+        Raises:
+            IndexError: If a value should be read from a line after the end of the text.
+        """
+        missing = {field for field in self.fields if not getattr(target, field, None)}
+
+        if missing:
+            for match in self._regex.finditer(text):
+                lines = None
+                for spec in self._by_anchor[match.group()]:
+                    if spec.field not in missing:
+                        continue
+
+                    if lines is None or len(lines) <= spec.offset:
+                        lines = self._window(text, match.start(), spec.offset)
+
+                    if spec.whole_line and lines[0] != spec.anchor:
+                        continue
+
+                    value = spec.read(lines, 0)
+                    if value:
+                        setattr(target, spec.field, value)
+                        missing.discard(spec.field)
+
+                if not missing:
+                    break
+
+        if self.after:
+            self.after(target)
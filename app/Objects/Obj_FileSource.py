@@ -0,0 +1,93 @@
+import os
+from typing import BinaryIO, Iterator
+from zipfile import ZipFile
+
+# Separa o caminho do ZIP do nome do arquivo dentro dele: "PDF.zip::fatura.pdf"
+ARCHIVE_SEP = '::'
+
+
+def member_path(zip_path: str, member: str) -> str:
+    """Returns the full path of a file inside a ZIP archive."""
+    return f'{zip_path}{ARCHIVE_SEP}{member}'
+
+
+def split_path(full_path: str) -> tuple[str, str | None]:
+    """
+    Splits a full path into the ZIP archive and the member name.
+
+    Returns:
+        tuple[str, str | None]: The archive and member, or the path and None
+            when it is a regular file.
+    """
+    if ARCHIVE_SEP in full_path:
+        zip_path, member = full_path.split(ARCHIVE_SEP, 1)
+        return zip_path, member
+    return full_path, None
+
+
+def resolve_source(folder: str, name: str) -> str:
+    """Returns `folder/name.zip` when the export was kept zipped, else `folder/name`."""
+    zip_path = os.path.join(folder, f'{name}.zip')
+    if os.path.isfile(zip_path):
+        return zip_path
+    return os.path.join(folder, name)
+
+
+def iter_files(source: str) -> Iterator[tuple[str, str]]:
+    """
+    Lists the files of a folder or of a ZIP archive, in name order.
+
+    Args:
+        source (str): A folder or a `.zip` file.
+
+    Yields:
+        tuple[str, str]: The file name and its full path (see `member_path`).
+    """
+    if source.lower().endswith('.zip') and os.path.isfile(source):
+        with ZipFile(source) as zip_ref:
+            members = sorted(info.filename for info in zip_ref.infolist()
+                             if not info.is_dir())
+        for member in members:
+            yield member, member_path(source, member)
+        return
+
+    for f in sorted(os.listdir(source)):
+        full_path = os.path.join(source, f)
+        if os.path.isdir(full_path):
+            continue
+        yield f, full_path
+
+
+def open_file(full_path: str) -> BinaryIO:
+    """
+    Opens a regular file or a ZIP member for binary reading.
+
+    The ZIP member is streamed from the archive, nothing is extracted to disk.
+    The caller is responsible for closing the returned handle.
+    """
+    zip_path, member = split_path(full_path)
+    if member is None:
+        return open(zip_path, 'rb')
+
+    zip_ref = ZipFile(zip_path)
+    try:
+        # O arquivo do ZIP só é fechado quando o membro também for fechado
+        return zip_ref.open(member)
+    finally:
+        zip_ref.close()
+
+
+def read_bytes(full_path: str) -> bytes:
+    """Reads a regular file or a ZIP member into memory."""
+    with open_file(full_path) as f:
+        return f.read()
+
+
+def file_size(full_path: str) -> int:
+    """Returns the uncompressed size of a regular file or ZIP member."""
+    zip_path, member = split_path(full_path)
+    if member is None:
+        return os.path.getsize(zip_path)
+
+    with ZipFile(zip_path) as zip_ref:
+        return zip_ref.getinfo(member).file_size
@@ -1,36 +1,55 @@
+from dataclasses import dataclass, fields
+
 import pandas as pd
 
+from Objects.Obj_Schema import apply_invoice_schema  # type: ignore
+
 
+@dataclass(slots=True)
 class Invoice:
-    def __init__(self,
-                 conta=None,
-                 fatura=None,
-                 valor=None,
-                 emissao=None,
-                 vencimento=None,
-                 arquivo=None,
-                 designacao=None,
-                 mesref=None,
-                 ) -> None:
-
-        self.conta = conta
-        self.fatura = fatura
-        self.valor = valor
-        self.emissao = emissao
-        self.vencimento = vencimento
-        self.arquivo = arquivo
-        self.designacao = designacao
-        self.mesref = mesref
-        self.inicio_periodo = None
-        self.fim_periodo = None
-        self.boleto = None
+    conta: str = None
+    fatura: str = None
+    valor: str = None
+    emissao: str = None
+    vencimento: str = None
+    arquivo: str = None
+    designacao: str = None
+    mesref: str = None
+    inicio_periodo: str = None
+    fim_periodo: str = None
+    boleto: str = None
+    operadora: str = None
+    path: str = None
+    full_path_file_pdf: str = None
+    ddd: str = None
+    tipo_leitura: int = None
+
+    @staticmethod
+    def columns() -> list[str]:
+        return [f.name for f in fields(Invoice)]
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in INVOICE_COLUMNS)
 
     def __str__(self) -> str:
-        atributos = []
-        for atributo, valor in self.__dict__.items():
-            atributos.append(f'{atributo} = {valor}')
-        return '\n'.join(atributos)
+        return '\n'.join(f'{name} = {getattr(self, name)}' for name in INVOICE_COLUMNS)
 
     def create_dataframe(self):
-        data = {key: [value] for key, value in self.__dict__.items()}
-        return pd.DataFrame.from_dict(data)
+        return invoices_dataframe([self.as_tuple()])
+
+
+INVOICE_COLUMNS = Invoice.columns()
+
+
+def invoices_dataframe(records) -> pd.DataFrame:
+    """
+    Builds a single typed DataFrame from invoice records.
+
+    Args:
+        records (Iterable[tuple]): Tuples in the `INVOICE_COLUMNS` order, see `Invoice.as_tuple`.
+
+    Returns:
+        pd.DataFrame: One row per record, typed by `apply_invoice_schema`.
+    """
+    df = pd.DataFrame.from_records(list(records), columns=INVOICE_COLUMNS)
+    return apply_invoice_schema(df)
@@ -0,0 +1,126 @@
+from typing import BinaryIO
+from uuid import uuid4
+
+from Objects.Obj_FileSource import file_size, open_file  # type: ignore
+
+
+def _quote(value: str) -> str:
+    """Escapes a header parameter the same way urllib3 does (HTML5 style)."""
+    return (value.replace('\\', '\\\\').replace('"', '%22')
+            .replace('\r', '%0D').replace('\n', '%0A'))
+
+
+class MultipartStream:
+    """
+    Corpo multipart/form-data montado sob demanda.
+
+    Os arquivos só são abertos quando a leitura chega neles e são fechados
+    logo em seguida, sendo enviados em blocos sem carregar o corpo inteiro
+    na memória. O tamanho é conhecido antes do envio (Content-Length).
+    """
+
+    def __init__(self, fields: dict, files: list[tuple[str, str, str, str]],
+                 boundary: str = None) -> None:
+        """
+        Args:
+            fields (dict): Form fields; None values are left out, like requests does.
+            files (list[tuple[str, str, str, str]]): (field, file name, full path,
+                content type) of each file, see `Obj_FileSource.open_file`.
+            boundary (str, optional): The multipart boundary. Defaults to a random one.
+        """
+        self.boundary = boundary or uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+
+        # Cada parte é um bloco de bytes ou o caminho de um arquivo
+        self._parts: list[bytes | str] = []
+        for name, value in fields.items():
+            if value is None:
+                continue
+            if not isinstance(value, bytes):
+                value = str(value).encode()
+
+            self._parts.append(self._header(name) + value + b'\r\n')
+
+        self._length = sum(len(part) for part in self._parts)
+        for field, filename, full_path, content_type in files:
+            header = self._header(field, filename, content_type)
+            self._parts += [header, full_path, b'\r\n']
+            self._length += len(header) + file_size(full_path) + 2
+
+        closing = f'--{self.boundary}--\r\n'.encode()
+        self._parts.append(closing)
+        self._length += len(closing)
+
+        self._index = 0
+        self._offset = 0
+        self._position = 0
+        self._file: BinaryIO = None
+
+    def _header(self, name: str, filename: str = None,
+                content_type: str = None) -> bytes:
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+
+        header = f'--{self.boundary}\r\nContent-Disposition: {disposition}\r\n'
+        if content_type:
+            header += f'Content-Type: {content_type}\r\n'
+        return (header + '\r\n').encode()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __enter__(self) -> 'MultipartStream':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """Only rewinding to the start is supported, e.g. to resend the body."""
+        if (offset, whence) != (0, 0):
+            raise OSError('MultipartStream só pode voltar ao início')
+
+        self.close()
+        self._index = 0
+        self._offset = 0
+        self._position = 0
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        remaining = self._length if size is None or size < 0 else size
+
+        while remaining > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            if isinstance(part, bytes):
+                chunk = part[self._offset:self._offset + remaining]
+                self._offset += len(chunk)
+                done = self._offset >= len(part)
+            else:
+                if self._file is None:
+                    self._file = open_file(part)
+                chunk = self._file.read(remaining)
+                done = not chunk
+                if done:
+                    self._file.close()
+                    self._file = None
+
+            if done:
+                self._index += 1
+                self._offset = 0
+
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b''.join(chunks)
+        self._position += len(data)
+        return data
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,14 +1,22 @@
+import io
 import os
 import re
+from functools import lru_cache
 
 import fitz
 from PyPDF2 import PdfReader
 
 
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
 class PDFReader:
-    def __init__(self, file, path) -> None:
+    def __init__(self, file, path, stream: bytes = None) -> None:
         self.file = file
         self.path = path
+        self.stream = stream
 
     def read_pdf(self, engine="fitz"):
         self.engine = engine
@@ -17,12 +25,18 @@ class PDFReader:
                 "Engine não reconhecida. Engines disponiveis: PyPDF2, fitz, PyMuPDF")
 
         if engine == "PyPDF2":
-            self._pdf_obj = open(os.path.join(self.path, self.file), 'rb')
+            if self.stream is not None:
+                self._pdf_obj = io.BytesIO(self.stream)
+            else:
+                self._pdf_obj = open(os.path.join(self.path, self.file), 'rb')
             self._pdf_readed = PdfReader(self._pdf_obj)
             return self._pdf_readed
 
         elif engine == "fitz" or engine == "PyMuPDF":
-            self._pdf_obj = fitz.open(os.path.join(self.path, self.file))
+            if self.stream is not None:
+                self._pdf_obj = fitz.open(stream=self.stream, filetype='pdf')
+            else:
+                self._pdf_obj = fitz.open(os.path.join(self.path, self.file))
             return self._pdf_obj
 
     def get_text(self, pdf, page) -> str:
@@ -36,7 +50,7 @@ class PDFReader:
                      sep: str = None, debug_line: bool = False,
                      regex: bool = None) -> str:
         if regex:
-            result = re.findall(element, line)
+            result = _compile(element).findall(line)
             if len(result) > 0:
                 return result
 
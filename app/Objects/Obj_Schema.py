@@ -0,0 +1,75 @@
+from functools import partial
+
+import pandas as pd
+
+# As datas dos PDFs aparecem com o ano completo ou com dois dígitos
+DATE_FORMATS = ('%d/%m/%Y', '%d/%m/%y')
+
+# Mês de referência gerado pelos leitores, independente do locale
+MESREF_FORMAT = '%Y-%m'
+
+
+def parse_dates(values: pd.Series, formats: tuple[str] = DATE_FORMATS) -> pd.Series:
+    """
+    Converts text dates trying each format in order, element by element.
+
+    Args:
+        values (pd.Series): The dates as text, None for missing.
+        formats (tuple[str], optional): The accepted formats. Defaults to DATE_FORMATS.
+
+    Returns:
+        pd.Series: datetime64 values, NaT for missing or unparseable.
+    """
+    text = values.astype('string').str.strip().str.lower()
+    dates = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for date_format in formats:
+        missing = dates.isna() & text.notna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(text[missing], format=date_format,
+                                        errors='coerce')
+    return dates
+
+
+def parse_valor(values: pd.Series) -> pd.Series:
+    """Converts values like 'R$ 1.234,56' to nullable floats."""
+    text = (values.astype('string').str.strip()
+            .str.removeprefix('R$').str.strip()
+            .str.replace('.', '', regex=False)
+            .str.replace(',', '.', regex=False))
+    return pd.to_numeric(text, errors='coerce').astype('Float64')
+
+
+def strip_text(values: pd.Series) -> pd.Series:
+    return values.str.strip()
+
+
+# Conversões das colunas dos registros dos PDFs, ver `Invoice`
+INVOICE_SCHEMA = {
+    'conta': lambda values: strip_text(values).astype('category'),
+    'fatura': strip_text,
+    'valor': parse_valor,
+    'emissao': parse_dates,
+    'vencimento': parse_dates,
+    'mesref': partial(parse_dates, formats=(MESREF_FORMAT,)),
+    'inicio_periodo': parse_dates,
+    'fim_periodo': parse_dates,
+    'boleto': strip_text,
+    'tipo_leitura': lambda values: values.astype('Int8'),
+}
+
+# Colunas do detalhamento com poucos valores distintos
+DETAIL_CATEGORIES = ['FILE_DET', 'FULL_PATH_FILE_DET', 'DESCRICAO']
+
+
+def apply_invoice_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Types the invoice frame read from the PDFs, see `INVOICE_SCHEMA`."""
+    return df.assign(**{column: convert(df[column])
+                        for column, convert in INVOICE_SCHEMA.items()
+                        if column in df.columns})
+
+
+def apply_detail_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Types the detail frame, see `DETAIL_CATEGORIES`."""
+    return df.astype({column: 'category' for column in DETAIL_CATEGORIES
+                      if column in df.columns})
@@ -0,0 +1,123 @@
+import os
+from typing import BinaryIO, Callable
+from urllib.parse import urlparse
+
+import requests as req
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class DirectDownloadError(Exception):
+    pass
+
+
+def session_from_webdriver(webdriver: WebDriver, pool_size: int = 4) -> req.Session:
+    """
+    Creates a pooled `requests` session authenticated with the browser cookies.
+
+    Args:
+        webdriver (WebDriver): The authenticated WebDriver instance.
+        pool_size (int, optional): Connections kept alive per host. Defaults to 4.
+
+    Returns:
+        req.Session: A session with the same cookies and User-Agent as the browser.
+    """
+    session = req.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers['User-Agent'] = webdriver.execute_script('return navigator.userAgent')
+
+    try:
+        # Todos os cookies do navegador, não só os do domínio atual
+        cookies = webdriver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+    except Exception:
+        cookies = webdriver.get_cookies()
+
+    for cookie in cookies:
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain'),
+                            path=cookie.get('path', '/'))
+
+    return session
+
+
+def is_direct_url(url: str | None) -> bool:
+    """Returns True when the link points to a file that can be fetched over HTTP."""
+    if not url:
+        return False
+
+    parsed = urlparse(url)
+    return parsed.scheme in ('http', 'https') and not parsed.fragment
+
+
+def stream_download(session: req.Session, url: str, dest: str | BinaryIO,
+                    progress: Callable[[int, int | None], None] = None,
+                    chunk_size: int = 1024 * 1024,
+                    timeout: float | tuple = (10, 120)) -> int:
+    """
+    Streams a file straight to disk or to a binary buffer.
+
+    Args:
+        session (req.Session): The authenticated session.
+        url (str): The file URL.
+        dest (str | BinaryIO): Output path, written atomically and only when the
+            download is complete, or a writable buffer.
+        progress (Callable[[int, int | None], None], optional): Called with the
+            bytes received so far and the total size, when known.
+        chunk_size (int, optional): Size of each read. Defaults to 1MB.
+        timeout (float | tuple, optional): Connect and read timeouts.
+
+    Returns:
+        int: The amount of bytes written.
+
+    Raises:
+        DirectDownloadError: If the server does not answer with the file or
+            sends fewer bytes than announced.
+    """
+    with session.get(url, stream=True, timeout=timeout) as r:
+        if r.status_code != 200:
+            raise DirectDownloadError(f'Erro [{r.status_code}] ao baixar {url}')
+
+        if 'text/html' in r.headers.get('Content-Type', ''):
+            # Sessão expirada ou link que depende de JavaScript
+            raise DirectDownloadError(f'Resposta HTML ao baixar {url}')
+
+        total = None
+        if 'Content-Length' in r.headers and 'Content-Encoding' not in r.headers:
+            total = int(r.headers['Content-Length'])
+
+        if isinstance(dest, str):
+            part = dest + '.part'
+            try:
+                with open(part, 'wb') as f:
+                    written = _copy_stream(r, f, chunk_size, total, progress)
+                # Um arquivo truncado nunca chega ao destino final
+                _check_length(written, total)
+                os.replace(part, dest)
+            finally:
+                if os.path.exists(part):
+                    os.remove(part)
+        else:
+            written = _copy_stream(r, dest, chunk_size, total, progress)
+            _check_length(written, total)
+
+    return written
+
+
+def _check_length(written: int, total: int | None) -> None:
+    if total is not None and written != total:
+        raise DirectDownloadError(f'Download incompleto: {written} de {total} bytes')
+
+
+def _copy_stream(response: req.Response, out: BinaryIO, chunk_size: int,
+                 total: int | None, progress: Callable | None) -> int:
+    written = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        out.write(chunk)
+        written += len(chunk)
+        if progress:
+            progress(written, total)
+
+    return written
@@ -0,0 +1,164 @@
+import base64
+import json
+import os
+from contextlib import contextmanager
+from threading import Lock
+from time import time
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: sem trava entre processos, apenas entre threads
+    fcntl = None
+
+
+def token_expiry(token: str) -> float | None:
+    """
+    Returns the `exp` claim (epoch seconds) of a JWT, or None when it can't be read.
+
+    The signature isn't checked, the expiry is only used to refresh in time.
+    """
+    try:
+        payload = token.split()[-1].split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload))['exp']
+        return float(exp)
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+@contextmanager
+def _file_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class TokenManager:
+    """
+    Token de acesso renovado pouco antes de expirar.
+
+    Threads concorrentes esperam uma única renovação. Com `path`, o token é
+    salvo no disco (permissão 0o600) e reaproveitado por outros processos e
+    execuções, com uma trava de arquivo para que só um deles faça o login.
+    """
+
+    def __init__(self, fetch: Callable[[], str], path: str = None,
+                 margin: float = 60, default_ttl: float = 30 * 60) -> None:
+        """
+        Args:
+            fetch (Callable[[], str]): Logs in and returns a new token.
+            path (str, optional): File where the token is persisted. Defaults to
+                None (kept only in memory).
+            margin (float, optional): Seconds before the expiry when the token is
+                refreshed. Defaults to 60.
+            default_ttl (float, optional): Lifetime assumed for tokens without a
+                readable `exp`. Defaults to 30 minutes.
+        """
+        if path:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+        self._fetch = fetch
+        self.path = path
+        self.margin = margin
+        self.default_ttl = default_ttl
+        self.refreshes = 0
+
+        self._token: str = None
+        self._expires = 0.0
+        self._lock = Lock()
+        self._pid = os.getpid()
+
+    def _valid(self) -> bool:
+        return self._token is not None and time() < self._expires - self.margin
+
+    def _check_fork(self) -> None:
+        # A trava herdada pelo fork pode estar presa por uma thread do processo pai
+        if self._pid != os.getpid():
+            self._lock = Lock()
+            self._pid = os.getpid()
+
+    def get(self) -> str:
+        """Returns a token valid for at least `margin` seconds, refreshing it when needed."""
+        self._check_fork()
+        if self._valid():
+            return self._token
+
+        with self._lock:
+            if not self._valid():
+                self._refresh()
+            return self._token
+
+    def invalidate(self, token: str = None) -> None:
+        """
+        Discards the token, e.g. after a 401, so the next `get` logs in again.
+
+        Args:
+            token (str, optional): Discard only if it is still the current token,
+                so a token refreshed by another thread is kept. Defaults to None.
+        """
+        self._check_fork()
+        with self._lock:
+            if token is not None and token != self._token:
+                return
+
+            if self.path:
+                with _file_lock(self.path + '.lock'):
+                    # Um token mais novo no arquivo é mantido para o próximo `get`
+                    if token is None or self._load() == token:
+                        self._remove()
+
+            self._token = None
+            self._expires = 0.0
+
+    def _refresh(self) -> None:
+        if not self.path:
+            self._set(self._fetch())
+            return
+
+        with _file_lock(self.path + '.lock'):
+            # Outro processo pode ter renovado enquanto esperávamos a trava
+            if self._load() and self._valid():
+                return
+
+            self._set(self._fetch())
+            self._save()
+
+    def _set(self, token: str) -> None:
+        self._token = token
+        self._expires = token_expiry(token) or time() + self.default_ttl
+        self.refreshes += 1
+
+    def _load(self) -> str | None:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self._token = data['token']
+            self._expires = float(data['expires'])
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+        return self._token
+
+    def _save(self) -> None:
+        temp = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'token': self._token, 'expires': self._expires}, f)
+        os.replace(temp, self.path)
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
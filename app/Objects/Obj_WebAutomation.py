@@ -1,12 +1,17 @@
 import os
 import platform
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from threading import Lock
 from time import sleep, time
+from typing import Iterator
 
 from selenium.common.exceptions import (ElementClickInterceptedException,
                                         ElementNotInteractableException,
                                         ElementNotSelectableException,
                                         ElementNotVisibleException,
-                                        JavascriptException)
+                                        JavascriptException,
+                                        TimeoutException)
 from selenium.webdriver import Chrome, ChromeOptions
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -50,6 +55,8 @@ class Driver:
             - The download folder path is stored as a private attribute `__download_folder__`.
         """
 
+        self.wait_times: list[tuple[str, float]] = []
+
         if download_folder:
             if not os.path.exists(download_folder):
                 raise FolderNotExistsError(
@@ -178,6 +185,52 @@ class Driver:
         except Exception as e:
             raise e
 
+    def wait_until(self,
+                   driver: WebDriver,
+                   condition,
+                   timeout: float = 30,
+                   label: str = 'wait',
+                   poll: float = 0.5):
+        """
+        Waits for a condition and records how long it actually took.
+
+        Args:
+            driver (WebDriver): The Selenium WebDriver instance.
+            condition (Callable[[WebDriver], Any]): Expected condition or callable
+                returning a truthy value once satisfied.
+            timeout (float, optional): Maximum time to wait in seconds. Defaults to 30.
+            label (str, optional): Name stored with the elapsed time in `wait_times`.
+            poll (float, optional): Polling interval in seconds. Defaults to 0.5.
+
+        Returns:
+            Any: The truthy value returned by the condition.
+
+        Raises:
+            TimeoutException: If the condition is not met before the timeout.
+        """
+        start = time()
+        try:
+            return WebDriverWait(driver,
+                                 timeout=timeout,
+                                 poll_frequency=poll,
+                                 ignored_exceptions=[
+                                     ElementNotVisibleException,
+                                     ElementNotSelectableException,
+                                     ElementNotInteractableException,
+                                     ElementClickInterceptedException,
+                                 ]).until(condition)
+        finally:
+            self.wait_times.append((label, time() - start))
+
+    def wait_report(self) -> str:
+        """Returns the recorded waits summed by label, e.g. 'Página: 3.2s (4x)'."""
+        totals: dict[str, list[float]] = {}
+        for label, elapsed in self.wait_times:
+            totals.setdefault(label, []).append(elapsed)
+
+        return ' | '.join(f'{label}: {sum(times):.1f}s ({len(times)}x)'
+                          for label, times in totals.items())
+
     def click_by_element(self,
                          driver: WebDriver,
                          x_path: str,
@@ -302,3 +355,235 @@ class Driver:
             setattr(print_opt, key, value)
 
         driver.print_page(print_opt)
+
+
+def process_tree_rss(pid: int) -> int:
+    """
+    Returns the resident memory (bytes) of a process and all its descendants.
+
+    Args:
+        pid (int): The root process id (the chromedriver service).
+
+    Returns:
+        int: The summed RSS in bytes, or 0 when /proc is not available.
+    """
+    if not os.path.isdir('/proc'):
+        return 0
+
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # O nome do processo pode conter espaços, o ppid vem após o ')'
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+        stack.extend(children.get(current, []))
+
+    return total
+
+
+class _PooledBrowser:
+    def __init__(self, driver: Driver, webdriver: WebDriver) -> None:
+        self.driver = driver
+        self.webdriver = webdriver
+        self.uses = 0
+
+    def rss(self) -> int:
+        try:
+            return process_tree_rss(self.webdriver.service.process.pid)
+        except AttributeError:
+            return 0
+
+
+class DriverPool:
+    """Pool de navegadores pré-inicializados reutilizados entre os logins"""
+
+    def __init__(self, base_folder: str, size: int = 1, max_uses: int = 20,
+                 max_rss_mb: float = 1500, no_window: bool = True,
+                 safe_sites: list = [], clear_origins: list = []):
+        """
+        Initializes a new pool of warm WebDriver sessions.
+
+        Args:
+            base_folder (str): Existing folder used as the initial download folder.
+            size (int, optional): Amount of browsers kept in the pool. Defaults to 1.
+            max_uses (int, optional): Leases before a browser is recycled. Defaults to 20.
+            max_rss_mb (float, optional): Resident memory (MB) of the browser process
+                tree above which it is recycled. Defaults to 1500.
+            no_window (bool, optional): Run the browsers in headless mode. Defaults to True.
+            safe_sites (list, optional): Safe sites passed to every new browser.
+            clear_origins (list, optional): Origins (e.g. 'https://site.com') whose
+                storage is cleared between leases.
+
+        Raises:
+            FolderNotExistsError: If the base folder does not exist.
+        """
+        if not os.path.exists(base_folder):
+            raise FolderNotExistsError(
+                f"O diretório {base_folder} não existe")
+
+        self.base_folder = base_folder
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.no_window = no_window
+        self.safe_sites = safe_sites
+        self.clear_origins = clear_origins
+
+        self._idle: LifoQueue[_PooledBrowser] = LifoQueue()
+        self._lock = Lock()
+        self._created = 0
+        self._closed = False
+
+    def _launch(self) -> _PooledBrowser:
+        driver = Driver(download_folder=self.base_folder)
+        webdriver = driver.new_driver(no_window=self.no_window,
+                                      safe_sites=self.safe_sites)
+        return _PooledBrowser(driver, webdriver)
+
+    def warm(self) -> None:
+        """Launches the browsers up to the pool size."""
+        with self._lock:
+            missing = max(self.size - self._created, 0)
+            self._created += missing
+
+        for launched in range(missing):
+            try:
+                browser = self._launch()
+            except Exception:
+                # Os que não abriram são liberados para o próximo _acquire
+                with self._lock:
+                    self._created -= missing - launched
+                raise
+
+            self._idle.put(browser)
+
+    def _acquire(self) -> _PooledBrowser:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+
+        with self._lock:
+            can_launch = self._created < self.size
+            if can_launch:
+                self._created += 1
+
+        if can_launch:
+            try:
+                return self._launch()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        return self._idle.get()
+
+    def _discard(self, browser: _PooledBrowser) -> None:
+        try:
+            browser.webdriver.quit()
+        except Exception:
+            pass
+
+        with self._lock:
+            self._created -= 1
+
+    def _reset(self, browser: _PooledBrowser) -> None:
+        """Clears cookies, cache and storage and leaves a single blank tab."""
+        webdriver = browser.webdriver
+        handles = webdriver.window_handles
+        for handle in handles[1:]:
+            webdriver.switch_to.window(handle)
+            webdriver.close()
+        webdriver.switch_to.window(handles[0])
+
+        webdriver.get('about:blank')
+        webdriver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        webdriver.execute_cdp_cmd('Network.clearBrowserCache', {})
+
+        # O Chrome só aceita origens reais, a página atual já é about:blank
+        for origin in self.clear_origins:
+            webdriver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                                      {'origin': origin, 'storageTypes': 'all'})
+
+    @staticmethod
+    def _point_downloads(browser: _PooledBrowser, download_folder: str) -> None:
+        if not os.path.exists(download_folder):
+            raise FolderNotExistsError(
+                f"O diretório {download_folder} não existe")
+
+        browser.driver.__download_folder__ = download_folder
+        browser.driver.wait_times = []
+        browser.webdriver.execute_cdp_cmd('Browser.setDownloadBehavior', {
+            'behavior': 'allow',
+            'downloadPath': os.path.abspath(download_folder),
+        })
+
+    def _release(self, browser: _PooledBrowser) -> None:
+        browser.uses += 1
+        recycle = self._closed or browser.uses >= self.max_uses
+        if not recycle and (rss := browser.rss()) > self.max_rss:
+            print(f'Reciclando navegador: {rss / 1024 / 1024:.0f}MB em uso')
+            recycle = True
+
+        if not recycle:
+            try:
+                self._reset(browser)
+            except Exception as e:
+                print(f'Falha ao limpar o navegador, reciclando: {e}')
+                recycle = True
+
+        if recycle:
+            # O substituto é aberto pelo próximo _acquire, fora do finally do lease
+            self._discard(browser)
+        else:
+            self._idle.put(browser)
+
+    @contextmanager
+    def lease(self, download_folder: str) -> Iterator[tuple[Driver, WebDriver]]:
+        """
+        Leases a clean browser whose downloads go to `download_folder`.
+
+        Args:
+            download_folder (str): Existing folder that receives the downloads.
+
+        Yields:
+            tuple[Driver, WebDriver]: The driver helper and its WebDriver.
+        """
+        browser = self._acquire()
+        try:
+            self._point_downloads(browser, download_folder)
+        except Exception:
+            self._discard(browser)
+            raise
+
+        try:
+            yield browser.driver, browser.webdriver
+        finally:
+            self._release(browser)
+
+    def close(self) -> None:
+        """Quits every idle browser; leased ones are quit when returned."""
+        self._closed = True
+        while True:
+            try:
+                browser = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(browser)
@@ -1,100 +1,117 @@
 import re
 import os
 import locale
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime as dt
+from itertools import repeat
+from typing import Iterator
 
 
 import pandas as pd
 
-from Objects.Obj_Invoice import Invoice  # type: ignore
+from Objects.Obj_DiskCache import DiskCache  # type: ignore
+from Objects.Obj_FieldExtractor import (LAST_WORD, LINE, REMOVEPREFIX,  # type: ignore
+                                        REPLACE, FieldExtractor, FieldSpec)
+from Objects.Obj_FileSource import (iter_files, open_file, read_bytes,  # type: ignore
+                                    split_path)
+from Objects.Obj_Invoice import Invoice, invoices_dataframe  # type: ignore
 from Objects.Obj_PDF_Reader import PDFReader  # type: ignore
+from Objects.Obj_Schema import MESREF_FORMAT  # type: ignore
 
 
 locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
 
 
-def __read_format_1__(pdf_object: PDFReader, page_text: str,
-                      invoice: Invoice) -> bool:
-    """
-    This function is used to extract information from a PDF file.
+def _to_mesref(input_format: str):
+    def convert(value: str) -> str:
+        return dt.strptime(value, input_format).strftime(MESREF_FORMAT)
+    return convert
 
-    Parameters:
-    pdf_object (PDFReader): An object that contains the PDF file.
-    page_text (str): The text of the PDF page.
-    invoice (Invoice): An object that contains the invoice information.
 
-    Returns:
-    bool: A boolean value indicating whether the extraction was successful.
+# Contas do layout 1 quando a linha do rótulo tem mais de duas palavras
+CONTA_PATTERNS_1 = [re.compile(p) for p in
+                    ('[0-9]+-[0-9]+', '[0-9]{7}', '[0-9]{8}', '[0-9]{10}')]
+VALOR_PATTERN_1 = re.compile('[0-9]*[.]?[0-9]+,[0-9]+')
 
-    """
-    invoice.tipo_leitura = 1
 
-    lines = page_text.split('\n')
-    for i, line in enumerate(lines):
-        # print(i, line.strip())
+def _conta_format_1(lines: list[str], i: int) -> str:
+    conta = lines[i].split()
+    if len(conta) == 1:
+        conta = lines[i + 1]
 
-        if not invoice.emissao:
-            if 'DATA DE EMISSAO' in line:
-                invoice.emissao = lines[i + 1]
+    elif len(conta) == 2:
+        conta = conta[-1]
 
-        if not invoice.mesref:
-            if invoice.emissao:
-                invoice.mesref = dt.strptime(invoice.emissao, '%d/%m/%Y')
-                invoice.mesref = invoice.mesref.strftime("%b-%Y")
+    else:
+        line = lines[i] + lines[i + 1]
+        conta = next((found[0] for pattern in CONTA_PATTERNS_1
+                      if (found := pattern.findall(line))), None)
 
-        if not invoice.conta:
-            if 'TELEFONE/CONTRATO:' in line:
-                invoice.conta = line.split()
-                if len(invoice.conta) == 1:
-                    invoice.conta = lines[i + 1]
+    if conta == 'CONTA' or not conta:
+        raise ValueError('Conta não encontrada')
 
-                elif len(invoice.conta) == 2:
-                    invoice.conta = invoice.conta[-1]
+    return conta
 
-                else:
-                    line = line + lines[i + 1]
-                    invoice.conta = pdf_object.find_element(
-                        line, '[0-9]+-[0-9]+', regex=True)
 
-                    if not invoice.conta:
-                        invoice.conta = pdf_object.find_element(
-                            line, '[0-9]{7}', regex=True)
+def _valor_format_1(lines: list[str], i: int) -> str | None:
+    found = VALOR_PATTERN_1.findall(lines[i] + "\n" + lines[i + 1])
+    return found[0] if found else None
 
-                    if not invoice.conta:
-                        invoice.conta = pdf_object.find_element(
-                            line, '[0-9]{8}', regex=True)
 
-                    if not invoice.conta:
-                        invoice.conta = pdf_object.find_element(
-                            line, '[0-9]{10}', regex=True)
+def _mesref_format_1(invoice: Invoice) -> None:
+    if not invoice.mesref and invoice.emissao:
+        invoice.mesref = dt.strptime(invoice.emissao, '%d/%m/%Y')
+        invoice.mesref = invoice.mesref.strftime(MESREF_FORMAT)
 
-                    if isinstance(invoice.conta, list):
-                        invoice.conta = invoice.conta[0]
 
-                if invoice.conta == 'CONTA' or not invoice.conta:
-                    raise ValueError('Conta não encontrada')
+FORMAT_1 = FieldExtractor([
+    FieldSpec('emissao', 'DATA DE EMISSAO', LINE, offset=1),
+    FieldSpec('conta', 'TELEFONE/CONTRATO:', _conta_format_1, offset=1),
+    FieldSpec('fatura', 'FATURA N', LAST_WORD),
+    FieldSpec('valor', 'VALOR A PAGAR', _valor_format_1, offset=1),
+    FieldSpec('vencimento', 'VENCIMENTO:', LAST_WORD),
+    FieldSpec('ddd', 'CODIGO DDD', LINE, offset=1),
+], after=_mesref_format_1)
 
-        if not invoice.fatura:
-            if 'FATURA N' in line:
-                invoice.fatura = line.split()[-1].strip()
+FORMAT_2 = FieldExtractor([
+    FieldSpec('emissao', 'Data de emissão:', LAST_WORD),
+    FieldSpec('mesref', 'Mês de referência:', REPLACE, convert=_to_mesref('%B %Y')),
+    FieldSpec('mesref', 'Referência', LINE, offset=1, whole_line=True,
+              convert=_to_mesref('%B/%Y')),
+    FieldSpec('conta', 'Contrato Agrupador:', REPLACE),
+    FieldSpec('fatura', 'Fatura: ', LAST_WORD),
+    FieldSpec('valor', 'Valor a pagar', LINE, offset=1),
+    FieldSpec('vencimento', 'Data de Vencimento', LINE, offset=1),
+])
 
-        if not invoice.valor:
-            if 'VALOR A PAGAR' in line:
-                line = line + "\n" + lines[i + 1]
-                invoice.valor = pdf_object.find_element(
-                    line, '[0-9]*[.]?[0-9]+,[0-9]+', regex=True)
-                if isinstance(invoice.valor, list):
-                    if len(invoice.valor) > 0:
-                        invoice.valor = invoice.valor[0]
+FORMAT_3 = FieldExtractor([
+    FieldSpec('emissao', 'Emissão em ', REMOVEPREFIX),
+    FieldSpec('mesref', 'FATURA DE', LINE, offset=2, convert=_to_mesref('%b/%Y')),
+    FieldSpec('conta', 'NÚMERO DO CLIENTE:', REMOVEPREFIX),
+    FieldSpec('fatura', 'NÚMERO DA FATURA:', REMOVEPREFIX),
+    FieldSpec('valor', 'PAGAR (R$)', LINE, offset=1),
+    FieldSpec('vencimento', 'VENCIMENTO', LINE, offset=2),
+])
 
-        if not invoice.vencimento:
-            if 'VENCIMENTO:' in line:
-                invoice.vencimento = line.split()[-1]
 
-        if not invoice.ddd:
-            if 'CODIGO DDD' in line:
-                invoice.ddd = lines[i + 1]
+def __read_format_1__(pdf_object: PDFReader, page_text: str,
+                      invoice: Invoice) -> bool:
+    """
+    This function is used to extract information from a PDF file.
+
+    Parameters:
+    pdf_object (PDFReader): An object that contains the PDF file.
+    page_text (str): The text of the PDF page.
+    invoice (Invoice): An object that contains the invoice information.
 
+    Returns:
+    bool: A boolean value indicating whether the extraction was successful.
+
+    """
+    invoice.tipo_leitura = 1
+    FORMAT_1.extract(page_text, invoice)
     return True
 
 
@@ -113,46 +130,7 @@ def __read_format_2__(pdf_object: PDFReader, page_text: str,
 
     """
     invoice.tipo_leitura = 2
-
-    lines = page_text.split('\n')
-    for i, line in enumerate(lines):
-        # print(i, line.strip())
-
-        if not invoice.emissao:
-            if 'Data de emissão' in line:
-                invoice.emissao = pdf_object.find_element(
-                    line,
-                    'Data de emissão:'
-                )
-
-        if not invoice.mesref:
-            if (rm_txt := 'Mês de referência:') in line:
-                invoice.mesref = line.replace(rm_txt, '').strip()
-                invoice.mesref = dt.strptime(invoice.mesref, '%B %Y')
-                invoice.mesref = invoice.mesref.strftime("%b-%Y")
-
-        if not invoice.mesref:
-            if 'Referência' == line:
-                invoice.mesref = lines[i + 1]
-                invoice.mesref = dt.strptime(invoice.mesref, '%B/%Y')
-                invoice.mesref = invoice.mesref.strftime("%b-%Y")
-
-        if not invoice.conta:
-            if (rm_txt := 'Contrato Agrupador:') in line:
-                invoice.conta = line.replace(rm_txt, '').strip()
-
-        if not invoice.fatura:
-            if 'Fatura: ' in line:
-                invoice.fatura = line.split()[-1].strip()
-
-        if not invoice.valor:
-            if 'Valor a pagar' in line:
-                invoice.valor = lines[i + 1]
-
-        if not invoice.vencimento:
-            if 'Data de Vencimento' in line:
-                invoice.vencimento = lines[i + 1]
-
+    FORMAT_2.extract(page_text, invoice)
     return True
 
 
@@ -171,127 +149,345 @@ def __read_format_3__(pdf_object: PDFReader, page_text: str,
 
     """
     invoice.tipo_leitura = 3
+    FORMAT_3.extract(page_text, invoice)
+    return True
 
-    lines = page_text.split('\n')
-    for i, line in enumerate(lines):
-        pass
-        # print(i, line.strip())
 
-        if not invoice.emissao:
-            if (rm_text := 'Emissão em ') in line:
-                invoice.emissao = line.removeprefix(rm_text).strip()
+# Campos que, preenchidos, encerram a leitura do PDF antes da última página
+REQUIRED_FIELDS = ('conta', 'fatura', 'valor', 'vencimento', 'emissao',
+                   'mesref', 'boleto', 'inicio_periodo', 'fim_periodo')
 
-        if not invoice.mesref:
-            if 'FATURA DE' in line:
-                invoice.mesref = lines[i + 2]
-                invoice.mesref = dt.strptime(invoice.mesref, '%b/%Y')
-                invoice.mesref = invoice.mesref.strftime("%b-%Y")
+# Linhas seguintes consultadas pelos leitores (lines[i + 1], lines[i + 2])
+LOOKAHEAD_LINES = 2
 
-        if not invoice.conta:
-            if (rm_txt := 'NÚMERO DO CLIENTE:') in line:
-                invoice.conta = line.removeprefix(rm_txt).strip()
+# Linhas já lidas que entram de novo na busca do boleto e do período, que
+# podem começar antes da quebra de página
+OVERLAP_LINES = 4
 
-        if not invoice.fatura:
-            if (rm_txt := 'NÚMERO DA FATURA:') in line:
-                invoice.fatura = line.removeprefix(rm_txt).strip()
+BOLETO_PATTERN = re.compile(r'(?:\d{5,}[\s.-]?\d\s+){4}')
+PERIODO_PATTERN = re.compile(r'[0-9]{2}/[0-9]{2}/[0-9]+ [aA] [0-9]{2}/[0-9]{2}/[0-9]+')
 
-        if not invoice.valor:
-            if 'PAGAR (R$)' in line:
-                invoice.valor = lines[i + 1]
 
-        if not invoice.vencimento:
-            if 'VENCIMENTO' in line:
-                invoice.vencimento = lines[i + 2]
+# Páginas do cabeçalho, onde ficam os marcadores que identificam o layout
+HEADER_PAGES = 2
 
-        # if not invoice.servicos:
-        #     if '' in line:
-        #         invoice.servicos = lines[i+1]
+FORMAT_1_MARKERS = ('VALOR REFERENTE A CONTA CUSTOMIZADA', 'PLANO LOCAL',
+                    'TELEFONE/CONTRATO')
 
-    return True
 
+def _page_markers(page: str, header: bool) -> set[str]:
+    """
+    Returns the layout markers found on a single page.
 
-def ler_boleto_oi(invoices_path):
+    'EMPRESAS' is a weak format 3 marker, only used when nothing else is found.
     """
-    This function is used to extract information from OI PDF files.
+    markers = set()
+    if header and 'contrato agrupador:' in page.lower():
+        markers.add('2')
+    if any(marker in page for marker in FORMAT_1_MARKERS):
+        markers.add('1')
+    if 'CHEGOU SUA FATURA DA OI' in page:
+        markers.add('3')
+    if 'EMPRESAS' in page:
+        markers.add('EMPRESAS')
+    return markers
+
+
+def _detect_format(markers: set[str], header_read: bool, last_page: bool):
+    """
+    Returns the reader of the PDF layout, or None while it can't be decided.
+
+    The format 2 marker is only looked for in the first HEADER_PAGES pages and
+    decides as soon as it shows up. Formats 1 and 3 (in this precedence) are
+    decided once the header was read, so the reading can stop early, and the
+    weak 'EMPRESAS' marker only on the last page.
+    """
+    if '2' in markers:
+        return __read_format_2__
+
+    if not (header_read or last_page):
+        return None
+
+    if '1' in markers:
+        return __read_format_1__
+
+    if '3' in markers or (last_page and 'EMPRESAS' in markers):
+        return __read_format_3__
+
+    return None
+
+
+def _extract_incremental(obj_pdf: PDFReader, pages, total_pages: int,
+                         invoice: Invoice) -> None:
+    """
+    Reads the pages lazily, filling the invoice as the text arrives, and stops
+    as soon as every field of REQUIRED_FIELDS is filled.
 
     Parameters:
-    invoices_path (str): The path to the folder containing the PDF files.
+    obj_pdf (PDFReader): The PDF reader object.
+    pages (Iterable[str]): The text of each page, extracted on demand.
+    total_pages (int): The amount of pages of the PDF.
+    invoice (Invoice): An object that receives the invoice information.
 
-    Returns:
-    None: The function saves the extracted information to a CSV file.
+    """
+    all_pages_text = []
+    lines: list[str] = []
+    processed = 0
+    read_format = None
+    markers: set[str] = set()
+
+    for pag, page in enumerate(pages):
+        last_page = pag == total_pages - 1
+        all_pages_text.append(page)
+        page_lines = page.split('\n')
+
+        # Só a página nova e o fim da anterior, as buscas anteriores não acharam nada
+        if not (invoice.boleto and invoice.inicio_periodo):
+            window = '\n'.join(lines[-OVERLAP_LINES:] + page_lines)
+
+        lines.extend(page_lines)
+
+        if not invoice.boleto:
+            cod_barras = BOLETO_PATTERN.search(window)
+            if cod_barras:
+                invoice.boleto = ' '.join(cod_barras[0].split('\n')[0].split(' '))
+
+        if not invoice.inicio_periodo:
+            periodo = PERIODO_PATTERN.search(window)
+            if periodo:
+                periodo = periodo[0].lower().split(' a ')
+                invoice.inicio_periodo = periodo[0]
+                invoice.fim_periodo = periodo[1]
+
+        if not read_format:
+            markers |= _page_markers(page, header=pag < HEADER_PAGES)
+            read_format = _detect_format(markers, pag >= HEADER_PAGES - 1, last_page)
+
+        if read_format:
+            # Reprocessa as últimas linhas já lidas, os campos podem estar na
+            # página seguinte à do rótulo
+            start = max(0, processed - LOOKAHEAD_LINES)
+            try:
+                read_format(obj_pdf, '\n'.join(lines[start:]), invoice)
+            except IndexError:
+                # Rótulo na última linha lida, o valor vem na próxima página
+                if last_page:
+                    raise
+            processed = len(lines)
+
+        if read_format and all(getattr(invoice, field) for field in REQUIRED_FIELDS):
+            break
+
+    if not invoice.boleto:
+        raise ValueError('Código de barras não encontrado')
+
+    if not read_format:
+        print('\n'.join(all_pages_text))
+        raise TypeError("Tipo de PDF não reconhecido, "
+                        "por favor revisar o PDF")
 
+
+def _read_invoice(f: str, full_path: str, invoices_path: str) -> tuple:
     """
-    files = os.listdir(invoices_path)
+    Extracts the invoice information of a single OI PDF file.
 
-    main_df = pd.DataFrame()
-    for f in files:
-        if os.path.isdir(os.path.join(invoices_path, f)):
-            continue
+    Parameters:
+    f (str): The file name.
+    full_path (str): The file path, or ZIP member path.
+    invoices_path (str): The folder or ZIP archive containing the file.
 
-        if not f.endswith('.pdf'):
-            continue
+    Returns:
+    tuple: The invoice record (see `Invoice.as_tuple`), cheap to send back from a worker process.
 
-        print(f"Lendo o arquivo {f}...")
+    """
+    print(f"Lendo o arquivo {f}...")
+    if split_path(full_path)[1] is None:
         obj_pdf = PDFReader(f, invoices_path)
-        invoice = Invoice()
+    else:
+        # Membro do ZIP, lido direto da memória
+        obj_pdf = PDFReader(f, invoices_path, stream=read_bytes(full_path))
+    invoice = Invoice()
 
-        # engine = "PyPDF2"  # PyPDF2 | fitz
-        engine = "fitz"  # PyPDF2 | fitz
-        pdf = obj_pdf.read_pdf(engine)
+    # engine = "PyPDF2"  # PyPDF2 | fitz
+    engine = "fitz"  # PyPDF2 | fitz
+    pdf = obj_pdf.read_pdf(engine)
 
-        invoice.operadora = "Oi"
-        invoice.arquivo = f
-        invoice.path = invoices_path
-        invoice.full_path_file_pdf = os.path.join(invoices_path, f)
-        invoice.ddd = None
+    invoice.operadora = "Oi"
+    invoice.arquivo = f
+    invoice.path = invoices_path
+    invoice.full_path_file_pdf = full_path
+    invoice.ddd = None
 
-        try:
-            total_pages = (len(pdf.pages) if engine == "PyPDF2"
-                           else pdf.page_count)
-            all_pages_text = []
-            for pag in range(total_pages):
-                # print("Numero da página:", pag + 1)
-                page: str = obj_pdf.get_text(pdf, pag)
+    try:
+        total_pages = (len(pdf.pages) if engine == "PyPDF2"
+                       else pdf.page_count)
+        pages = (obj_pdf.get_text(pdf, pag) for pag in range(total_pages))
+        _extract_incremental(obj_pdf, pages, total_pages, invoice)
 
-                all_pages_text.append(page)
+    except Exception as e:
+        raise e
+    finally:
+        obj_pdf.close_pdf()
 
-            full_text = '\n'.join(all_pages_text)
+    return invoice.as_tuple()
 
-            cod_barras = re.findall(r'(?:\d{5,}[\s.-]?\d\s+){4}', full_text)
-            invoice.boleto = ' '.join(cod_barras[0].split('\n')[0].split(' '))
 
-            periodo = re.findall(r'[0-9]{2}/[0-9]{2}/[0-9]+ [aA] [0-9]{2}/[0-9]{2}/[0-9]+', full_text)
-            if periodo:
-                periodo = periodo[0].lower().split(' a ')
-                invoice.inicio_periodo = periodo[0]
-                invoice.fim_periodo = periodo[1]
+def auto_workers(total_files: int, files_per_worker: int = 10) -> int:
+    """
+    Chooses the amount of processes from the CPUs available and the amount of
+    files, so small exports don't pay the cost of starting a pool.
+
+    Parameters:
+    total_files (int): The amount of PDF files to read.
+    files_per_worker (int): Minimum amount of files that justifies a process.
+
+    Returns:
+    int: The amount of processes, 1 meaning the serial path.
+
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    return max(1, min(cpus, total_files // files_per_worker))
+
+
+# Mudar sempre que a extração mudar, invalidando o cache de leitura
+READER_VERSION = '2'
+
+# Campos que dependem de onde o arquivo está, não do seu conteúdo
+PATH_FIELDS = ('arquivo', 'path', 'full_path_file_pdf')
+
+DEFAULT_PARSE_CACHE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    '.cache', 'parse_cache.sqlite')
+
+
+def get_parse_cache() -> DiskCache | None:
+    """
+    Opens the on-disk cache of the PDF readings.
+
+    The location comes from the env OI_PARSE_CACHE ('0' disables the cache) and
+    the size limit, in MB, from OI_PARSE_CACHE_MB.
+
+    Returns:
+    DiskCache | None: The cache, or None when it is disabled.
+
+    """
+    path = os.getenv('OI_PARSE_CACHE', DEFAULT_PARSE_CACHE)
+    if path in ('', '0'):
+        return None
+
+    max_mb = float(os.getenv('OI_PARSE_CACHE_MB', 64))
+    return DiskCache(path, max_bytes=int(max_mb * 1024 * 1024))
+
+
+def _cache_key(full_path: str) -> str:
+    """Returns the reader version and the SHA-256 of the PDF content."""
+    with open_file(full_path) as f:
+        digest = hashlib.file_digest(f, 'sha256').hexdigest()
+    return f'{READER_VERSION}:{digest}'
 
-            if 'contrato agrupador:' in full_text.lower():
-                __read_format_2__(obj_pdf, full_text, invoice)
 
-            elif 'VALOR REFERENTE A CONTA CUSTOMIZADA' in full_text or \
-                    'PLANO LOCAL' in full_text or \
-                    'TELEFONE/CONTRATO' in full_text:
-                __read_format_1__(obj_pdf, full_text, invoice)
+def _from_cache(values: list, f: str, full_path: str, invoices_path: str) -> tuple:
+    invoice = Invoice(*values)
+    invoice.arquivo = f
+    invoice.path = invoices_path
+    invoice.full_path_file_pdf = full_path
+    return invoice.as_tuple()
 
-            elif 'CHEGOU SUA FATURA DA OI' in full_text or \
-                    'EMPRESAS' in full_text:
-                __read_format_3__(obj_pdf, full_text, invoice)
 
-            else:
-                print(full_text)
-                raise TypeError("Tipo de PDF não reconhecido, "
-                                "por favor revisar o PDF")
+def _to_cache(record: tuple) -> list:
+    invoice = Invoice(*record)
+    for field in PATH_FIELDS:
+        setattr(invoice, field, None)
+    return list(invoice.as_tuple())
+
+
+def iter_boletos_oi(invoices_path, workers: int | str = 1,
+                    cache: DiskCache = None) -> Iterator[tuple]:
+    """
+    Streams the invoice records of the OI PDF files, in file name order.
+
+    Parameters:
+    invoices_path (str): The path to the folder or ZIP archive containing the PDF files.
+    workers (int | str): Amount of processes used to read the PDFs, or 'auto'
+        to choose it from the CPU and file counts. 1 reads them serially.
+    cache (DiskCache): Readings already done, keyed by the PDF content. Only the
+        PDFs missing from it are read, and their readings are stored.
+
+    Yields:
+    tuple: One record per PDF, see `Invoice.as_tuple`.
 
-        except Exception as e:
-            raise e
+    """
+    files = [(f, full_path) for f, full_path in iter_files(invoices_path)
+             if f.endswith('.pdf')]
+
+    keys = [None] * len(files)
+    cached = [None] * len(files)
+    if cache is not None:
+        for i, (_, full_path) in enumerate(files):
+            keys[i] = _cache_key(full_path)
+            cached[i] = cache.get(keys[i])
+
+    pending = [i for i, values in enumerate(cached) if values is None]
+
+    workers = auto_workers(len(pending)) if workers == 'auto' else int(workers)
+    workers = max(1, min(workers, len(pending)))
+
+    names = [files[i][0] for i in pending]
+    paths = [files[i][1] for i in pending]
+
+    def read_pending() -> Iterator[tuple]:
+        if workers > 1:
+            print(f'Lendo {len(pending)} PDFs em {workers} processos...')
+            # spawn: o processo atual pode ter threads e um Chrome aberto,
+            # que não devem ser copiados por fork
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                # map mantém a ordem dos arquivos, igual à leitura serial
+                yield from executor.map(
+                    _read_invoice, names, paths, repeat(invoices_path),
+                    chunksize=max(1, len(pending) // (workers * 4)))
         else:
-            main_df = pd.concat([main_df, invoice.create_dataframe()])
-        finally:
-            obj_pdf.close_pdf()
+            yield from map(_read_invoice, names, paths, repeat(invoices_path))
+
+    records = read_pending()
+    for i, (f, full_path) in enumerate(files):
+        if cached[i] is not None:
+            yield _from_cache(cached[i], f, full_path, invoices_path)
+            continue
+
+        record = next(records)
+        if cache is not None:
+            cache.set(keys[i], _to_cache(record))
+        yield record
 
-    main_df['valor'] = main_df['valor'].str.removeprefix('R$ ')
-    main_df.reset_index(drop=True, inplace=True)
+
+def ler_boleto_oi(invoices_path, workers: int | str = 1,
+                  use_cache: bool = True) -> pd.DataFrame:
+    """
+    This function is used to extract information from OI PDF files.
+
+    Parameters:
+    invoices_path (str): The path to the folder or ZIP archive containing the PDF files.
+    workers (int | str): Amount of processes used to read the PDFs, or 'auto'
+        to choose it from the CPU and file counts. 1 reads them serially.
+    use_cache (bool): Reuse the readings of identical PDFs, see `get_parse_cache`.
+
+    Returns:
+    pd.DataFrame: The extracted information, one row per PDF in file name order,
+        typed by `apply_invoice_schema`.
+
+    """
+    cache = get_parse_cache() if use_cache else None
+    try:
+        main_df = invoices_dataframe(iter_boletos_oi(invoices_path, workers, cache))
+    finally:
+        if cache is not None:
+            print(f'Cache de leitura dos PDFs: {cache.stats()}')
+            cache.close()
 
     return main_df
 
@@ -14,143 +14,331 @@ Returns:
 
 import locale
 import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import pandas as pd
 
+from Objects.Obj_FileSource import iter_files, open_file  # type: ignore
+from Objects.Obj_Schema import apply_detail_schema  # type: ignore
+
 locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
 
 
-def __reader_1__(df: pd.DataFrame) -> pd.DataFrame:
-    df = df[[
-        'FATURA',
-        'FONE-ORIG',
-        'VALOR',
-        'BLOCO'
-    ]]
+try:
+    # O leitor do pyarrow lê o CSV em várias threads, fora do GIL
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+
+class DetailLayout:
+    """Colunas usadas de um layout de detalhamento e seus nomes padronizados"""
 
-    df = df.rename(columns={
-        'FONE-ORIG': 'ORIGEM',
-        'BLOCO': 'DESCRICAO',
-    })
+    def __init__(self, name: str, fatura: str, origem: str,
+                 valor: str, descricao: str) -> None:
+        self.name = name
+        self.valor = valor
+        self.columns = {
+            fatura: 'FATURA',
+            origem: 'ORIGEM',
+            valor: 'VALOR',
+            descricao: 'DESCRICAO',
+        }
 
-    return df
+    def __repr__(self) -> str:
+        return f'DetailLayout({self.name})'
 
+    def matches(self, header: list[str]) -> bool:
+        return set(self.columns).issubset(header)
 
-def __reader_2__(df: pd.DataFrame) -> pd.DataFrame:
-    df = df[[
-        'FATURA',
-        'Nº Origem',
-        'Valor (R$)',
-        'Descrição'
-    ]]
+    def read_csv(self, buffer, typed: bool = True, chunksize: int = None):
+        """
+        Lê somente as quatro colunas do layout
 
-    df = df.rename(columns={
-        'Nº Origem': 'ORIGEM',
-        'Valor (R$)': 'VALOR',
-        'Descrição': 'DESCRICAO',
-    })
+        Args:
+            buffer (BinaryIO): Arquivo aberto do detalhamento
+            typed (bool, optional): Lê o valor direto como float. Quando False
+                ele é lido como texto e convertido depois (ver `_partial_sums`).
+            chunksize (int, optional): Lê o arquivo em blocos com essa quantidade de linhas
 
-    return df
+        Returns:
+            pd.DataFrame | Iterator[pd.DataFrame]: As colunas já renomeadas
+        """
+        if chunksize is None and pa_csv is not None:
+            return self.rename(self._read_arrow(buffer, typed))
 
+        dtype = {column: str for column in self.columns}
+        if typed:
+            dtype[self.valor] = 'float64'
 
-def __reader_3__(df: pd.DataFrame) -> pd.DataFrame:
-    df = df[[
-        'NUMERO DA FATURA',
-        'TELEFONE',
-        'VALOR BRUTO',
-        'DESCRICAO DO SERVICO'
-    ]]
+        chunks = pd.read_csv(buffer, sep=';', encoding='utf-8', decimal=',',
+                             usecols=list(self.columns), dtype=dtype,
+                             chunksize=chunksize)
+        if chunksize is None:
+            return self.rename(chunks)
+        return map(self.rename, chunks)
 
-    df = df.rename(columns={
-        'NUMERO DA FATURA': 'FATURA',
-        'TELEFONE': 'ORIGEM',
-        'VALOR BRUTO': 'VALOR',
-        'DESCRICAO DO SERVICO': 'DESCRICAO',
-    })
+    def _read_arrow(self, buffer, typed: bool) -> pd.DataFrame:
+        """
+        Lê as colunas com o pyarrow, com o mesmo resultado do `pd.read_csv`
 
-    return df
+        Os tipos vão direto para o leitor: com o engine 'pyarrow' do pandas o
+        dtype só é aplicado depois da inferência, e '0099' viraria '99'.
+        """
+        column_types = {column: pa.string() for column in self.columns}
+        if typed:
+            column_types[self.valor] = pa.float64()
+
+        table = pa_csv.read_csv(
+            buffer,
+            parse_options=pa_csv.ParseOptions(delimiter=';'),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types, include_columns=list(self.columns),
+                decimal_point=',', strings_can_be_null=True))
+
+        # Vazios como NaN, igual ao pandas, e não None
+        df = table.to_pandas()
+        return df.where(df.notna(), np.nan)
+
+    def rename(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.rename(columns=self.columns)
+
+
+DETAIL_LAYOUTS = [
+    DetailLayout('TXT', 'FATURA', 'FONE-ORIG', 'VALOR', 'BLOCO'),
+    DetailLayout('DetalhamentoFaturaExcel', 'FATURA', 'Nº Origem',
+                 'Valor (R$)', 'Descrição'),
+    DetailLayout('Fatura_Excel', 'NUMERO DA FATURA', 'TELEFONE',
+                 'VALOR BRUTO', 'DESCRICAO DO SERVICO'),
+]
+
+
+def _read_header(f: str) -> list[str]:
+    """Lê somente a primeira linha do arquivo"""
+    with open_file(f) as buffer:
+        line = buffer.readline()
+
+    # utf-8-sig descarta o BOM do início do arquivo, como o read_csv faz
+    line = line.decode('utf-8-sig').rstrip('\r\n')
+    return [column.strip().strip('"') for column in line.split(';')]
+
+
+GROUP_COLUMNS = ['FATURA', 'ORIGEM', 'DESCRICAO']
+
+# Os valores são somados em inteiros (milionésimos), assim a soma não
+# depende da ordem nem do tamanho dos blocos lidos
+VALOR_SCALE = 10 ** 6
+
+# Quantidade de linhas de somas parciais que dispara uma compactação
+COMPACT_ROWS = 200_000
+
+
+def _select_layout(filename: str, f: str) -> DetailLayout | None:
+    """
+    Escolhe o layout do detalhamento pelas colunas do cabeçalho
+
+    Returns:
+        DetailLayout | None: O layout, ou None quando o arquivo deve ser ignorado
+    """
+    if 'Documentos nao Baixados' in filename:
+        return None
+
+    header = _read_header(f)
+    for layout in DETAIL_LAYOUTS:
+        if layout.matches(header):
+            return layout
+
+    raise AttributeError("Tipo de arquivo não reconhecido")
+
+
+def _partial_sums(temp_df: pd.DataFrame) -> pd.Series:
+    """Soma os valores, em inteiros, de um bloco do detalhamento"""
+    valor = temp_df['VALOR']
+    if valor.dtype == object:
+        valor = valor.str.replace(',', '.').astype(float)
+
+    temp_df = temp_df.assign(
+        FATURA=temp_df['FATURA'].astype(str).str.strip(),
+        ORIGEM=temp_df['ORIGEM'].astype(str).str.strip(),
+        DESCRICAO=temp_df['DESCRICAO'].astype(str).str.strip(),
+        VALOR=valor.fillna(0).mul(VALOR_SCALE).round().astype('int64'))
+
+    return temp_df.groupby(GROUP_COLUMNS, sort=False)['VALOR'].sum()
+
+
+def _merge_sums(partials: list[pd.Series]) -> pd.Series:
+    return pd.concat(partials).groupby(level=GROUP_COLUMNS, sort=False).sum()
 
 
-def read_files(details_path: str) -> pd.DataFrame:
+def _read_file(filename: str, f: str, layout: DetailLayout,
+               chunksize: int = None, typed: bool = True) -> pd.DataFrame:
+    """
+    Lê um detalhamento e soma os valores por FATURA, ORIGEM e DESCRICAO
+
+    Args:
+        filename (str): Nome do arquivo
+        f (str): Caminho completo do arquivo, ou do membro do ZIP
+        layout (DetailLayout): Layout do arquivo
+        chunksize (int, optional): Lê o arquivo em blocos com essa quantidade
+            de linhas, somando parcialmente cada bloco. Assim a memória depende
+            da quantidade de grupos e não do tamanho do arquivo.
+        typed (bool, optional): Lê o valor direto como float. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Valores somados por grupo, vazio quando o arquivo não tem linhas
+    """
+    with open_file(f) as buffer:
+        chunks = layout.read_csv(buffer, typed, chunksize)
+        if chunksize is None:
+            chunks = [chunks]
+
+        partials = []
+        rows = 0
+        for temp_df in chunks:
+            if temp_df.empty:
+                continue
+
+            partials.append(_partial_sums(temp_df))
+            rows += len(partials[-1])
+
+            # Compacta as somas parciais para manter a memória limitada
+            if len(partials) > 1 and rows > COMPACT_ROWS:
+                partials = [_merge_sums(partials)]
+                rows = len(partials[0])
+
+    if not partials:
+        return pd.DataFrame()
+
+    sums = _merge_sums(partials) if len(partials) > 1 else partials[0]
+    temp_df = sums.sort_index().reset_index()
+    temp_df['VALOR'] = temp_df['VALOR'] / VALOR_SCALE
+
+    temp_df['FILE_DET'] = filename
+    temp_df['FULL_PATH_FILE_DET'] = f
+    return temp_df
+
+
+def _read_file_safe(filename: str, f: str, layout: DetailLayout,
+                    chunksize: int = None) -> pd.DataFrame:
+    try:
+        return _read_file(filename, f, layout, chunksize)
+    except ValueError:
+        # Valores fora do padrão decimal com vírgula, lidos como texto
+        return _read_file(filename, f, layout, chunksize, typed=False)
+
+
+def read_files(details_path: str, chunksize: int = None,
+               workers: int = None) -> pd.DataFrame:
     """
     Lê os arquivos da pasta details_path, processa as colunas importante
     e retorna um dataframe Pandas com as informações
 
     Args:
-        details_path (str): Pasta onde se encontra os detalhamentos
+        details_path (str): Pasta ou arquivo ZIP onde se encontra os detalhamentos
+        chunksize (int, optional): Quando informado, lê cada arquivo em blocos
+            com essa quantidade de linhas (ver `_read_file`). Os totais são
+            os mesmos da leitura do arquivo inteiro.
+        workers (int, optional): Quantidade de threads que leem os arquivos ao
+            mesmo tempo. Por padrão uma por CPU, limitada à quantidade de arquivos.
 
     Raises:
         AttributeError: Retorna um erro quando o arquivo não é reconhecido
 
     Returns:
-        pd.DataFrame: Retorna um dataframe com as informações dos detalhamentos
+        pd.DataFrame: Retorna um dataframe com as informações dos detalhamentos,
+            na ordem dos nomes dos arquivos
     """
-    df = pd.DataFrame()
-    det_files = os.listdir(details_path)
+    det_files = list(iter_files(details_path))
 
     if len(det_files) == 0:
         raise FileNotFoundError(
             "Nenhum arquivo encontrado na pasta de detalhamentos")
 
-    # Lê os arquivos
-    for filename in det_files:
+    # Escolhe os layouts antes de ler, assim um arquivo desconhecido
+    # interrompe a leitura antes de qualquer trabalho pesado
+    jobs = []
+    for filename, f in det_files:
         # Ignora arquivos que não terminam em .csv e .txt
-        f = os.path.join(details_path, filename)
         if (not filename.lower().endswith('.csv')
                 and not filename.lower().endswith('.txt')):
             print('jump')
             continue
 
-        # Cria um DF temporário lendo o pdf
-        temp_df = pd.read_csv(f, sep=';', encoding='utf-8',
-                              decimal=',', dtype=str)
+        try:
+            layout = _select_layout(filename, f)
+        except AttributeError:
+            print("Arquivo", f)
+            raise
 
-        if filename.endswith('.TXT'):
-            temp_df = __reader_1__(temp_df)
+        if layout is None:
+            continue
 
-        elif 'DetalhamentoFaturaExcel' in filename:
-            temp_df = __reader_2__(temp_df)
+        jobs.append((filename, f, layout))
 
-        elif 'Fatura_Excel' in filename:
-            temp_df = __reader_3__(temp_df)
+    if not workers:
+        try:
+            workers = len(os.sched_getaffinity(0))
+        except AttributeError:
+            workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
 
-        elif 'Documentos nao Baixados' in filename:
-            continue
+    # O parser do pandas (e o do pyarrow) libera o GIL, então as threads
+    # leem os arquivos em paralelo; map mantém a ordem dos arquivos
+    names, paths, layouts = zip(*jobs) if jobs else ((), (), ())
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(_read_file_safe, names, paths,
+                                       layouts, repeat(chunksize)))
+    else:
+        frames = list(map(_read_file_safe, names, paths,
+                          layouts, repeat(chunksize)))
 
-        else:
-            print("Arquivo", f)
-            raise AttributeError("Tipo de arquivo não reconhecido")
+    frames = [temp_df for temp_df in frames if not temp_df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    return apply_detail_schema(pd.concat(frames, ignore_index=True))
 
-        if not temp_df.empty:
-            temp_df['FATURA'] = temp_df['FATURA'].astype(str).str.strip()
-            temp_df['ORIGEM'] = temp_df['ORIGEM'].astype(str).str.strip()
-            temp_df['DESCRICAO'] = temp_df['DESCRICAO'].astype(str).str.strip()
-            temp_df['VALOR'] = (temp_df['VALOR']
-                                .str.replace(',', '.')
-                                .astype(float))
 
-            temp_df = temp_df.groupby(['FATURA', 'ORIGEM', 'DESCRICAO']).sum()
-            temp_df = temp_df.reset_index()
+INVOICE_GROUP_COLUMNS = ['FATURA', 'FILE_DET', 'FULL_PATH_FILE_DET']
 
-            temp_df['FILE_DET'] = filename
-            temp_df['FULL_PATH_FILE_DET'] = os.path.join(details_path, filename)
-            df = pd.concat([df, temp_df], ignore_index=True)
 
+def _sum_by_invoice(df: pd.DataFrame) -> pd.DataFrame:
+    """Soma os valores do detalhamento por fatura e arquivo"""
+    # Volta para os inteiros de `_partial_sums`, somando sem erro de arredondamento
+    valor = df['VALOR'].mul(VALOR_SCALE).round().astype('int64')
+    df = (df[INVOICE_GROUP_COLUMNS].assign(VALOR=valor)
+          .groupby(INVOICE_GROUP_COLUMNS, observed=True).sum().reset_index())
+    df['VALOR'] = df['VALOR'] / VALOR_SCALE
     return df
 
 
-def leitor_detalhamento_oi(details_path: str,
-                           df_invoices: pd.DataFrame) -> pd.DataFrame:
+def leitor_detalhamento_oi(details_path: str, df_invoices: pd.DataFrame,
+                           chunksize: int = None, workers: int = None,
+                           detail_level: str = 'invoice') -> pd.DataFrame:
     """
     Função principal onde é lido os detalhamentos, concatenado com as
     informações das faturas e no final é gerado um arquivo com essas
     informações.
 
     Args:
-        details_path (str): Pasta onde se localiza os detalhamentos dos arquivos.
+        details_path (str): Pasta ou arquivo ZIP onde se localiza os detalhamentos dos arquivos.
         df_invoices (pd.DataFrame): Dataframe com as informações das faturas
+        chunksize (int, optional): Lê os detalhamentos em blocos com essa
+            quantidade de linhas, para arquivos muito grandes.
+        workers (int, optional): Quantidade de threads que leem os detalhamentos.
+        detail_level (str, optional): 'invoice' soma o detalhamento por fatura
+            e arquivo antes de juntar com as faturas. 'row' mantém uma linha
+            por FATURA/ORIGEM/DESCRICAO, para auditoria. Defaults to 'invoice'.
     """
-    df = read_files(details_path=details_path)
+    if detail_level not in ('invoice', 'row'):
+        raise ValueError(f"detail_level inválido: {detail_level}")
+
+    df = read_files(details_path=details_path, chunksize=chunksize,
+                    workers=workers)
     df = df.loc[df['VALOR'] != 0]
 
     # Transforma as colunas em uppercase
@@ -158,17 +346,15 @@ def leitor_detalhamento_oi(details_path: str,
 
     # Remove os '0' à esquerda das faturas, para prevenção de erros com nomes
     df_invoices['FATURA'] = df_invoices['FATURA'].str.lstrip('0')
-    df['FATURA'] = df['FATURA'].str.lstrip('0')
+    df = df.assign(FATURA=df['FATURA'].str.lstrip('0'))
+
+    if detail_level == 'invoice':
+        df = _sum_by_invoice(df)
 
     # Agrupa o df de detalhamento com o df das faturas lidas
     df = df.merge(df_invoices, how='right', on='FATURA',
                   suffixes=('_DET', '_PDF'))
 
-    # Remove os espaçamentos em branco em todas as células
-    df = df.map(lambda x: str(x).strip())
-
-    # df.loc[:, 'VALOR_DET'] = (df['VALOR_DET'].str.replace('.', ','))
-
     print('Detalhamento gerado com sucesso!')
 
     return df
@@ -7,18 +7,21 @@ from datetime import datetime as dt
 from datetime import timedelta as td
 from tempfile import TemporaryDirectory
 
-from Objects.Obj_ApiSpringBase import BaseClient
+from Objects.Obj_ApiSpringBase import BaseClient, BaseInvoice
 
-from Automations.Download_OI_Files import down_oi, get_drivers, do_auth
-from Objects.Obj_ApiSpring import API_Spring
+from Automations.Download_OI_Files import down_oi_exports, open_drivers, do_auth
+from Objects.Obj_ApiSpring import API_Spring, UploadError
+from Objects.Obj_FileSource import resolve_source
 from Objects.Obj_UploadFatura import FaturaInfo
+from Objects.Obj_WebAutomation import DriverPool
 from Readers.Leitor_Boleto_OI import ler_boleto_oi
 from Readers.Leitor_Detalhamentos_OI import leitor_detalhamento_oi
 
 locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
 
 
-def Oi_Process(login: BaseClient, oi_path: str | TemporaryDirectory):
+def Oi_Process(login: BaseClient, oi_path: str | TemporaryDirectory,
+               pool: DriverPool = None, enviadas: set = None):
     now = dt.now()
 
     init_date = (dt(now.year, now.month, 1))
@@ -33,39 +36,34 @@ def Oi_Process(login: BaseClient, oi_path: str | TemporaryDirectory):
     os.chdir(os.path.dirname(__file__))
 
     # Abaixa o datalhamento das faturas OI
-    driver, webdriver = get_drivers(oi_path)
+    with open_drivers(oi_path, pool) as (driver, webdriver):
+        print('Logando na OI...')
+        do_auth(driver, webdriver, login)
+        print('Logado!')
 
-    print('Logando na OI...')
-    do_auth(driver, webdriver, login)
-    print('Logado!')
-
-    print('Baixando PDFs...')
-    down_oi(driver, webdriver, oi_path, init_date, final_date, 'PDF')
-
-    print('Baixando detalhamentos...')
-    down_oi(driver, webdriver, oi_path, init_date, final_date, 'CSV')
-
-    webdriver.quit()
+        print('Baixando PDFs e detalhamentos...')
+        down_oi_exports(driver, webdriver, oi_path, init_date, final_date,
+                        ('PDF', 'CSV'))
 
     print('Lendo boletos Oi')
-    df_invoices = ler_boleto_oi(os.path.join(oi_path, "PDF"))
+    # Leitura serial por padrão: o processo já é um dos trabalhadores de main.py
+    df_invoices = ler_boleto_oi(resolve_source(oi_path, "PDF"),
+                                workers=os.getenv('OI_PDF_WORKERS', '1'))
 
     print('Lendo detalhamentos Oi')
-    main_df = leitor_detalhamento_oi(os.path.join(oi_path, "CSV"), df_invoices)
+    chunksize = os.getenv('OI_DET_CHUNKSIZE')
+    det_workers = os.getenv('OI_DET_WORKERS')
+    main_df = leitor_detalhamento_oi(resolve_source(oi_path, "CSV"), df_invoices,
+                                     chunksize=int(chunksize) if chunksize else None,
+                                     workers=int(det_workers) if det_workers else None,
+                                     detail_level=os.getenv('OI_DET_LEVEL', 'invoice'))
 
     main_df = tratar_df(main_df)
 
     faturas = criar_fatura(main_df, login)
 
     print('Subindo faturas no SC...')
-    try:
-        upload_fatura(faturas)
-    except Exception as e:
-        raise e
-    finally:
-        for _, files in faturas:
-            for file in files:
-                file[1].close()
+    upload_fatura(faturas, enviadas)
 
     print('Finalizado!')
 
@@ -80,92 +78,150 @@ def tratar_df(df: pd.DataFrame):
 
     df = df[filtrar_colunas]
     filtrar_colunas.remove('VALOR_DET')
-    df.loc[:, 'VALOR_PDF'] = pd.to_numeric(df['VALOR_PDF'].str.replace('.', '').str.replace(',', '.'))
 
-    non_related_df = df[df['VALOR_DET'] == 'nan']
+    sem_detalhamento = df['VALOR_DET'].isna()
+
+    non_related_df = df[sem_detalhamento]
     if not non_related_df.empty:
         print(f'\033[1;33m{non_related_df.shape[0]} linhas sem detalhamento\033[m')
         print(non_related_df)
-        df = df[df['FILE_DET'] != 'nan']
 
-    df.loc[:, 'VALOR_DET'] = pd.to_numeric(df['VALOR_DET'])
-    df = df.groupby(filtrar_colunas).sum().reset_index()
+    df = df[~sem_detalhamento]
+
+    # Datas e períodos vazios também fazem parte da chave da fatura
+    df = df.groupby(filtrar_colunas, observed=True, dropna=False).sum().reset_index()
     return df
 
 
-def criar_fatura(df: pd.DataFrame, login: BaseClient) -> list[tuple[FaturaInfo, list[tuple]]]:
-    def formatar_data(data: str, input_format='%d/%m/%Y', output_format='%Y-%m-%d'):
-        if data is None or data == '' or data.lower() == 'none':
-            return None
+ESPACOS = re.compile(r'\s')
+NAO_ALFANUMERICO = re.compile(r'[^A-Za-z0-9]+')
 
-        return dt.strptime(data.lower(), input_format).strftime(output_format)
 
-    def limpar_texto(texto: str):
-        texto = re.sub(r'\s', '', texto)
-        texto = texto.replace('1ªVia', '')
-        texto = re.sub(r'[^A-Za-z0-9]+', '', texto)
-        return texto
+def limpar_texto(texto: str):
+    texto = ESPACOS.sub('', texto)
+    texto = texto.replace('1ªVia', '')
+    texto = NAO_ALFANUMERICO.sub('', texto)
+    return texto
 
-    faturas = []
 
-    print('Contas baixadas:', df['CONTA'].unique().tolist())
+def indexar_contas(login: BaseClient) -> dict[str, BaseInvoice]:
+    """
+    Indexa as contas do login pelo número normalizado (ver `limpar_texto`)
 
-    for _, row in df.iterrows():
-        acc = None
-        for conta in login.contas:
-            if limpar_texto(row['CONTA']) == limpar_texto(conta.numero_conta):
-                acc = conta
-                print('Conta localizada:', acc)
-                break
+    Números diferentes que ficam iguais depois de normalizados são avisados
+    e ficam fora do índice, para a fatura não ir para a conta errada.
 
-        if not acc:
-            print(f'Conta {limpar_texto(row["CONTA"])} não localizada!')
+    Args:
+        login (BaseClient): Login com as contas cadastradas
+
+    Returns:
+        dict[str, BaseInvoice]: Conta de cada número normalizado
+    """
+    index: dict[str, BaseInvoice] = {}
+    ambiguas: dict[str, list[BaseInvoice]] = {}
+
+    for conta in login.contas:
+        if not conta.numero_conta:
             continue
 
-        inv = FaturaInfo()
-        now = dt.now()
+        chave = limpar_texto(conta.numero_conta)
+        atual = index.get(chave)
+        if atual is None:
+            index[chave] = conta
+        elif atual.conta_id != conta.conta_id:
+            ambiguas.setdefault(chave, [atual]).append(conta)
+
+    for chave, contas in ambiguas.items():
+        print(f'\033[1;33mConta {chave} ambígua, ignorada: {contas}\033[m')
+        del index[chave]
+
+    return index
+
+
+def _formatar_datas(datas: pd.Series, output_format='%Y-%m-%d') -> pd.Series:
+    """Formata uma coluna de datas de uma vez, com None nas vazias"""
+    return datas.dt.strftime(output_format).astype(object).where(datas.notna(), None)
+
 
-        num_conta = limpar_texto(acc.numero_conta)
-        format_det = row["FILE_DET"].lower().split(".")[-1]
+def _formatar_valores(valores: pd.Series) -> pd.Series:
+    return valores.astype('float64').astype(object).where(valores.notna(), None)
 
-        nome_arquivo_pdf = f'OI_{formatar_data(row["VENCIMENTO"], output_format="%d%m%y")}_{num_conta}.pdf'
-        nome_arquivo_digital = f'OI_{formatar_data(row["VENCIMENTO"], output_format="%d%m%y")}_{num_conta}.{format_det}'
 
-        try:
-            inv.CicloInicio = formatar_data(row['INICIO_PERIODO'], input_format='%d/%m/%Y')
-            inv.CicloFim = formatar_data(row['FIM_PERIODO'], input_format='%d/%m/%Y')
-        except ValueError:
-            inv.CicloInicio = formatar_data(row['INICIO_PERIODO'], input_format='%d/%m/%y')
-            inv.CicloFim = formatar_data(row['FIM_PERIODO'], input_format='%d/%m/%y')
+def criar_fatura(df: pd.DataFrame, login: BaseClient) -> list[tuple[FaturaInfo, list[tuple]]]:
+    faturas = []
+
+    print('Contas baixadas:', df['CONTA'].unique().tolist())
 
-        inv.AnoReferencia = formatar_data(row['MESREF'], input_format='%b-%Y', output_format='%Y')
-        inv.ArquivoAzurePdf = nome_arquivo_pdf
-        inv.ArquivoAzureDigital = nome_arquivo_digital
-        inv.CodigoBarra = row['BOLETO']
+    contas = indexar_contas(login)
+
+    # CONTA é categórica, a normalização roda uma vez por conta distinta
+    chaves = df['CONTA'].map(limpar_texto).astype(str)
+
+    localizadas = chaves.isin(contas.keys())
+    for chave in chaves[~localizadas]:
+        print(f'Conta {chave} não localizada!')
+
+    df = df[localizadas]
+    chaves = chaves[localizadas]
+
+    # Colunas do payload calculadas de uma vez para todas as faturas
+    vencimento_arquivo = _formatar_datas(df['VENCIMENTO'], '%d%m%y').fillna('None')
+    format_det = df['FILE_DET'].astype(str).str.lower().str.split('.').str[-1]
+    nome_arquivo = 'OI_' + vencimento_arquivo + '_' + chaves
+
+    dados = pd.DataFrame({
+        'NomeArquivoPdf': nome_arquivo + '.pdf',
+        'NomeArquivoDigital': nome_arquivo + '.' + format_det,
+        'TipoArquivoDigital': format_det.map({'txt': 'text/plain'}).fillna('text/csv'),
+        'CicloInicio': _formatar_datas(df['INICIO_PERIODO']),
+        'CicloFim': _formatar_datas(df['FIM_PERIODO']),
+        'AnoReferencia': _formatar_datas(df['MESREF'], '%Y'),
+        'MesReferencia': _formatar_datas(df['MESREF'], '%m'),
+        'Emissao': _formatar_datas(df['EMISSAO']),
+        'Vencimento': _formatar_datas(df['VENCIMENTO']),
+        'CodigoBarra': df['BOLETO'].astype(object).where(df['BOLETO'].notna(), None),
+        'ValorDocumentoDigital': _formatar_valores(df['VALOR_DET']),
+        'ValorDocumentoPDF': _formatar_valores(df['VALOR_PDF']),
+        'FullPathPdf': df['FULL_PATH_FILE_PDF'].astype(str),
+        'FullPathDigital': df['FULL_PATH_FILE_DET'].astype(str),
+    })
+
+    now = dt.now().strftime('%Y-%m-%dT%H:%M:%S')
+
+    for chave, row in zip(chaves, dados.to_dict('records')):
+        acc = contas[chave]
+        print('Conta localizada:', acc)
+
+        inv = FaturaInfo()
+        inv.CicloInicio = row['CicloInicio']
+        inv.CicloFim = row['CicloFim']
+        inv.AnoReferencia = row['AnoReferencia']
+        inv.ArquivoAzurePdf = row['NomeArquivoPdf']
+        inv.ArquivoAzureDigital = row['NomeArquivoDigital']
+        inv.CodigoBarra = row['CodigoBarra']
         inv.ContaId = acc.conta_id
         inv.ClienteId = acc.cliente_id
-        inv.DownloadArquivo = now.strftime('%Y-%m-%dT%H:%M:%S')
-        inv.Emissao = formatar_data(row['EMISSAO'])
-        inv.DownloadArquivoCliente = now.strftime('%Y-%m-%dT%H:%M:%S')
+        inv.DownloadArquivo = now
+        inv.Emissao = row['Emissao']
+        inv.DownloadArquivoCliente = now
         inv.FornecedorClasseId = acc.fornecedor_classe_id if acc.fornecedor_classe_id else login.fornecedor_classe_id
         inv.FornecedorId = acc.fornecedor_id
         inv.LoginId = 1
-        inv.MesReferencia = formatar_data(row['MESREF'], input_format='%b-%Y', output_format='%m')
-        inv.NomeArquivoDigital = nome_arquivo_digital
-        inv.NomeArquivoPdf = nome_arquivo_pdf
+        inv.MesReferencia = row['MesReferencia']
+        inv.NomeArquivoDigital = row['NomeArquivoDigital']
+        inv.NomeArquivoPdf = row['NomeArquivoPdf']
         inv.NumeroConta = acc.numero_conta
-        inv.ValorDocumentoDigital = row['VALOR_DET']
-        inv.ValorDocumentoPDF = row['VALOR_PDF']
-        inv.Vencimento = formatar_data(row['VENCIMENTO'])
+        inv.ValorDocumentoDigital = row['ValorDocumentoDigital']
+        inv.ValorDocumentoPDF = row['ValorDocumentoPDF']
+        inv.Vencimento = row['Vencimento']
         inv.Status = 'PENDENTE'
         inv.TipoContaId = acc.tipo_conta_id
         inv.UnidadeId = acc.unidade_id
 
-        # 'files': (fat_name, byte_file, 'application/pdf')
-        file_pdf = (nome_arquivo_pdf, open(row['FULL_PATH_FILE_PDF'], 'rb'), 'application/pdf')
-
-        type_det = 'text/plain' if format_det == 'txt' else 'text/csv'
-        file_det = (nome_arquivo_digital, open(row['FULL_PATH_FILE_DET'], 'rb'), type_det)
+        # 'files': (fat_name, full_path, 'application/pdf'), abertos só no envio
+        file_pdf = (row['NomeArquivoPdf'], row['FullPathPdf'], 'application/pdf')
+        file_det = (row['NomeArquivoDigital'], row['FullPathDigital'],
+                    row['TipoArquivoDigital'])
 
         files = [file_pdf, file_det]
 
@@ -174,9 +230,53 @@ def criar_fatura(df: pd.DataFrame, login: BaseClient) -> list[tuple[FaturaInfo,
     return faturas
 
 
-def upload_fatura(faturas: list[tuple[FaturaInfo, list[tuple]]]) -> None:
-    api = API_Spring('hml')
-    for fatura, files in faturas:
-        payload = fatura.__dict__
+def chave_fatura(payload: dict) -> tuple:
+    """Identifica a fatura entre as tentativas de um mesmo login"""
+    return (payload.get('NumeroConta'), payload.get('Vencimento'),
+            payload.get('NomeArquivoPdf'))
 
-        api.up_invoice(payload, files)
+
+def upload_fatura(faturas: list[tuple[FaturaInfo, list[tuple]]],
+                  enviadas: set = None) -> list[dict]:
+    """
+    Envia as faturas ao SC, várias ao mesmo tempo (ver `API_Spring.up_invoices`)
+
+    Uma fatura com erro não interrompe o envio das demais.
+
+    Args:
+        faturas (list[tuple[FaturaInfo, list[tuple]]]): Faturas e seus arquivos
+        enviadas (set, optional): Chaves (ver `chave_fatura`) das faturas já
+            enviadas em tentativas anteriores, que não são enviadas de novo.
+            As faturas enviadas agora são adicionadas a ele.
+
+    Raises:
+        UploadError: Quando alguma fatura não foi enviada, depois de tentar todas
+
+    Returns:
+        list[dict]: Resultado do envio de cada fatura pendente
+    """
+    if enviadas is None:
+        enviadas = set()
+
+    pendentes = [(fatura.__dict__, files) for fatura, files in faturas
+                 if chave_fatura(fatura.__dict__) not in enviadas]
+    if len(pendentes) < len(faturas):
+        print(f'{len(faturas) - len(pendentes)} fatura(s) já enviada(s) em tentativa anterior')
+
+    api = API_Spring('hml')
+    results = api.up_invoices(pendentes)
+    for (payload, _), r in zip(pendentes, results):
+        if r['status'] == 'success':
+            enviadas.add(chave_fatura(payload))
+
+    falhas = [r for r in results if r['status'] != 'success']
+    print(f'Faturas enviadas: {len(results) - len(falhas)} de {len(results)}')
+    for r in falhas:
+        print(f'\033[1;31mFalha no envio da conta {r["conta"]} '
+              f'({r["arquivo"]}): {r["error"]}\033[m')
+
+    if falhas:
+        raise UploadError(f'{len(falhas)} de {len(results)} fatura(s) não enviada(s): '
+                          + '; '.join(f'{r["arquivo"]}: {r["error"]}' for r in falhas))
+
+    return results
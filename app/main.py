@@ -1,62 +1,200 @@
 import os
-from tempfile import TemporaryDirectory
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+from tempfile import TemporaryDirectory, mkdtemp
+from time import perf_counter
 import traceback
 from functions import Oi_Process
-from Objects.Obj_ApiSpring import LoginError, get_logins, send_log
+from Automations.Download_OI_Files import get_driver_pool
+from Objects.Obj_ApiSpring import (API_Spring, LoginError, get_logins,
+                                   latency_report, merge_latency, send_log)
+from Objects.Obj_ApiSpringBase import BaseClient
+from Objects.Obj_WebAutomation import DriverPool
 
+ORIGIN = 'Automação OI Fixa-Dados'
 
-def main():
-    current_dir = os.path.dirname(__file__)
-    ambient = 'hml'
-    logins = get_logins('OI', 'hml')
+# Pool de navegadores do processo atual, criado em init_worker
+_driver_pool: DriverPool = None
+
+
+def init_worker(current_dir: str) -> None:
+    """
+    Inicializa o processo trabalhador com um navegador já aberto.
+
+    Args:
+        current_dir (str): Pasta onde é criada a pasta base do pool.
+    """
+    global _driver_pool
+
+    # Os contadores herdados do processo principal já entram no resumo dele
+    API_Spring.latency_snapshot(reset=True)
+
+    base_folder = mkdtemp(prefix='oi_pool_', dir=current_dir)
+    _driver_pool = get_driver_pool(base_folder)
+
+    def close_pool():
+        _driver_pool.close()
+        shutil.rmtree(base_folder, ignore_errors=True)
+
+    # Processos do multiprocessing não executam o atexit
+    Finalize(None, close_pool, exitpriority=10)
+
+    try:
+        _driver_pool.warm()
+    except Exception as e:
+        print(f'Falha ao pré-iniciar o navegador: {e}')
+
+
+def get_workers(total_logins: int) -> int:
+    """
+    Define a quantidade de processos (um Chrome por processo) utilizados.
+
+    Args:
+        total_logins (int): Quantidade de logins a serem processados.
+
+    Returns:
+        int: Variável de ambiente OI_WORKERS ou a quantidade de CPUs,
+            limitado à quantidade de logins.
+    """
+    workers = int(os.getenv('OI_WORKERS') or os.cpu_count() or 1)
+    return max(1, min(workers, total_logins))
+
+
+def process_login(login: BaseClient, ambient: str, current_dir: str,
+                  tries: int = 3) -> dict:
+    """
+    Executa o processo da OI para um login, com as tentativas e o envio de log.
+
+    Args:
+        login (BaseClient): Login a ser processado.
+        ambient (str): Ambiente da API Spring.
+        current_dir (str): Pasta onde são criadas as pastas temporárias.
+        tries (int, optional): Quantidade de tentativas. Defaults to 3.
+
+    Returns:
+        dict: Status, tentativas utilizadas, tempo gasto no login e
+            latência da API Spring no processo.
+    """
+    print(f'\n|{"="*60}|')
+    print(login)
+
+    start = perf_counter()
+    status = 'error'
+    try_num = 0
+    # Faturas já enviadas não são reenviadas nas próximas tentativas
+    enviadas = set()
+    for try_num in range(1, tries + 1):
+        with TemporaryDirectory(prefix='oi_', dir=current_dir) as oi_path:
+            try:
+                Oi_Process(login, oi_path, _driver_pool, enviadas)
+
+            except LoginError as e:
+                print(e)
+                tb = traceback.format_exc()
+                status = 'login_error'
+                send_log(
+                    ambient=ambient,
+                    title=f'Erro nas credenciais do cliente {login.cliente_id}',
+                    message=str(e),
+                    stacktrace=tb,
+                    origin=ORIGIN,
+                    status='error',
+                    cliente_adm_id=login.cliente_id
+                )
+                break
 
-    for login in logins:
-        print(f'\n|{"="*60}|')
-        print(login)
-        tries = 3
-        for try_num in range(tries):
-            with TemporaryDirectory(prefix='oi_', dir=current_dir) as oi_path:
-                try:
-                    Oi_Process(login, oi_path)
-
-                except LoginError as e:
-                    print(e)
-                    tb = traceback.format_exc()
+            except Exception as e:
+                print(e)
+                tb = traceback.format_exc()
+                if try_num == tries:
                     send_log(
                         ambient=ambient,
-                        title=f'Erro nas credenciais do cliente {login.cliente_id}',
+                        title=f'Erro de processo do cliente {login.cliente_id}',
                         message=str(e),
                         stacktrace=tb,
-                        origin='Automação OI Fixa-Dados',
+                        origin=ORIGIN,
                         status='error',
                         cliente_adm_id=login.cliente_id
                     )
-                    break
-
-                except Exception as e:
-                    print(e)
-                    if try_num == tries - 1:
-                        send_log(
-                            ambient=ambient,
-                            title=f'Erro de processo do cliente {login.cliente_id}',
-                            message=str(e),
-                            stacktrace=tb,
-                            origin='Automação OI Fixa-Dados',
-                            status='error',
-                            cliente_adm_id=login.cliente_id
-                        )
-
-                else:
-                    send_log(
-                        ambient=ambient,
-                        title=f'Download concluído com sucesso do cliente {login.cliente_id}',
-                        message='',
-                        stacktrace='',
-                        origin='Automação OI Fixa-Dados',
-                        status='success',
-                        cliente_adm_id=login.cliente_id
-                    )
-                    break
+
+            else:
+                status = 'success'
+                send_log(
+                    ambient=ambient,
+                    title=f'Download concluído com sucesso do cliente {login.cliente_id}',
+                    message='',
+                    stacktrace='',
+                    origin=ORIGIN,
+                    status='success',
+                    cliente_adm_id=login.cliente_id
+                )
+                break
+
+    return {
+        'login': repr(login),
+        'status': status,
+        'tries': try_num,
+        'elapsed': perf_counter() - start,
+        'api': API_Spring.latency_snapshot(reset=True),
+    }
+
+
+def print_summary(results: list[dict], wall_time: float, workers: int) -> None:
+    summed = sum(r['elapsed'] for r in results)
+    status = {}
+    for r in results:
+        status[r['status']] = status.get(r['status'], 0) + 1
+
+    print(f'\n|{"="*60}|')
+    for r in results:
+        print(f'{r["login"]}: {r["status"]} em {r["tries"]} tentativa(s), '
+              f'{r["elapsed"]:.1f}s')
+
+    print(f'Logins: {len(results)} | Processos: {workers} | Status: {status}')
+    print(f'Tempo total: {wall_time:.1f}s | Soma dos logins: {summed:.1f}s'
+          f' | Ganho: {summed / wall_time if wall_time else 0:.2f}x')
+
+    # Latência somada do processo principal e dos trabalhadores
+    api = API_Spring.latency_snapshot()
+    for r in results:
+        merge_latency(api, r.get('api', {}))
+
+    if api:
+        print(f'API Spring:\n{latency_report(api)}')
+
+
+def main(workers: int = None):
+    current_dir = os.path.dirname(__file__)
+    ambient = 'hml'
+    logins = get_logins('OI', 'hml')
+    if not logins:
+        return
+
+    workers = workers or get_workers(len(logins))
+
+    start = perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=init_worker,
+                             initargs=(current_dir,)) as executor:
+        futures = {
+            executor.submit(process_login, login, ambient, current_dir): login
+            for login in logins
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f'Falha no processo do login {futures[future]}: {e}')
+                results.append({
+                    'login': repr(futures[future]),
+                    'status': 'crash',
+                    'tries': 0,
+                    'elapsed': 0.0,
+                })
+
+    print_summary(results, perf_counter() - start, workers)
 
 
 # Main function execution starts here
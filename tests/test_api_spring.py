@@ -0,0 +1,203 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from Objects.Obj_ApiSpring import API_Spring, get_logins
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        if self.path == '/token':
+            server.logins += 1
+            self._reply(200, {'token': f'token-{server.logins}'})
+            return
+
+        server.uploads.append((self.headers['Authorization'], body))
+        if self.headers['Authorization'] in server.revoked:
+            self._reply(401, {})
+        else:
+            self._reply(200, {})
+
+    def _reply(self, status: int, data: dict) -> None:
+        self.send_response(status)
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
+
+
+@pytest.fixture
+def server(monkeypatch):
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    srv.logins = 0
+    srv.uploads = []
+    srv.revoked = {'Bearer token-1'}
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{srv.server_port}'
+    monkeypatch.setenv('hml_end_get_token', f'{url}/token')
+    monkeypatch.setenv('hml_end_up_invoice', f'{url}/upload')
+    monkeypatch.setenv('API_SPRING_PERSIST_TOKEN', '0')
+    monkeypatch.setattr(API_Spring, '_tokens', {})
+    yield srv
+    srv.shutdown()
+
+
+PAYLOAD = {'ArquivoAzurePdf': 'fatura.pdf', 'NomeArquivoPdf': 'fatura.pdf',
+           'ArquivoAzureDigital': 'det.csv', 'NomeArquivoDigital': 'det.csv'}
+
+
+def test_upload_from_path_retried_whole_after_401(server, tmp_path):
+    pdf = tmp_path / 'fatura.pdf'
+    pdf.write_bytes(b'%PDF' + bytes(range(256)) * 4)
+
+    API_Spring('hml').up_invoice_file(PAYLOAD, ('fatura.pdf', str(pdf), 'application/pdf'))
+
+    assert [auth for auth, _ in server.uploads] == ['Bearer token-1', 'Bearer token-2']
+    first, retry = (body for _, body in server.uploads)
+    assert retry == first
+    assert pdf.read_bytes() in retry
+
+
+def test_upload_from_file_object_retried_whole_after_401(server, tmp_path):
+    pdf = tmp_path / 'fatura.pdf'
+    pdf.write_bytes(b'%PDF' + bytes(range(256)) * 4)
+
+    with open(pdf, 'rb') as f:
+        API_Spring('hml').up_invoice_file(PAYLOAD, ('fatura.pdf', f, 'application/pdf'))
+
+    assert len(server.uploads) == 2
+    assert pdf.read_bytes() in server.uploads[1][1]
+
+
+class LoginsHandler(Handler):
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        if self.path.startswith('/fornecedores'):
+            self._reply(200, {'data': [{'id': 1, 'clienteAdmId': 20},
+                                       {'id': 1, 'clienteAdmId': None},
+                                       {'id': 1, 'clienteAdmId': 10}]})
+        elif self.path.startswith('/logins'):
+            clientes = query.get('clienteId', ['10', '20'])
+            self._reply(200, {'data': [
+                {'id': int(c), 'clienteId': int(c), 'login': f'user{c}', 'senha': 'x',
+                 'fornecedorId': 1} for c in clientes]})
+        else:
+            cliente = query['ClienteId'][0]
+            self._reply(200, {'data': [{'id': int(cliente), 'numeroConta': cliente,
+                                        'fornecedorId': 1, 'clienteId': int(cliente)}]})
+
+
+def test_get_logins_with_clientes_without_id(monkeypatch):
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), LoginsHandler)
+    srv.logins = 0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{srv.server_port}'
+    monkeypatch.setenv('hml_end_get_token', f'{url}/token')
+    monkeypatch.setenv('hml_end_get_fornecedores_id', f'{url}/fornecedores')
+    monkeypatch.setenv('hml_end_logins', f'{url}/logins')
+    monkeypatch.setenv('hml_end_get_invoices', f'{url}/accounts')
+    monkeypatch.setattr(API_Spring, '_tokens', {})
+    try:
+        logins = get_logins('OI', 'hml', use_cache=False)
+    finally:
+        srv.shutdown()
+
+    assert [login.cliente_id for login in logins] == [10, 20, 10, 20]
+    assert [len(login.contas) for login in logins] == [1, 1, 0, 0]
+
+
+class CachedHandler(Handler):
+    def do_GET(self) -> None:
+        server = self.server
+        server.gets.append(self.headers.get('If-None-Match'))
+        if self.path.startswith('/fornecedores'):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            self.wfile.write(json.dumps({'data': [{'id': 1, 'clienteAdmId': 10}]}).encode())
+        else:
+            self._reply(200, {'data': [{'id': 1, 'clienteId': 10, 'login': 'user',
+                                        'senha': 'SEGREDO', 'fornecedorId': 1}]})
+
+
+@pytest.fixture
+def cached_server(monkeypatch, tmp_path):
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), CachedHandler)
+    srv.logins = 0
+    srv.gets = []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+
+    url = f'http://127.0.0.1:{srv.server_port}'
+    monkeypatch.setenv('hml_end_get_token', f'{url}/token')
+    monkeypatch.setenv('hml_end_get_fornecedores_id', f'{url}/fornecedores')
+    monkeypatch.setenv('hml_end_logins', f'{url}/logins')
+    monkeypatch.setenv('API_SPRING_CACHE', str(tmp_path / 'api_cache.sqlite'))
+    monkeypatch.delenv('API_SPRING_NO_CACHE', raising=False)
+    monkeypatch.delenv('API_SPRING_CACHE_KEY', raising=False)
+    monkeypatch.setattr(API_Spring, '_tokens', {})
+    monkeypatch.setattr(API_Spring, '_cache', None)
+    yield srv
+    if API_Spring._cache is not None:
+        API_Spring._cache.close()
+    srv.shutdown()
+
+
+def test_fresh_entry_skips_the_request(cached_server):
+    api = API_Spring('hml')
+
+    assert api.get_fornecedores_by_name('OI') == [(1, 10)]
+    assert api.get_fornecedores_by_name('OI') == [(1, 10)]
+    assert len(cached_server.gets) == 1
+
+
+def test_expired_entry_revalidated_with_etag(cached_server, monkeypatch):
+    monkeypatch.setenv('API_SPRING_TTL_FORNECEDORES', '0')
+    api = API_Spring('hml')
+
+    api.get_fornecedores_by_name('OI')
+    assert api.get_fornecedores_by_name('OI') == [(1, 10)]
+    assert cached_server.gets == [None, '"v1"']
+
+
+def test_bypass_always_requests(cached_server):
+    api = API_Spring('hml', use_cache=False)
+
+    api.get_fornecedores_by_name('OI')
+    api.get_fornecedores_by_name('OI')
+    assert len(cached_server.gets) == 2
+
+
+def test_logins_not_cached_without_key(cached_server, monkeypatch, capsys):
+    monkeypatch.setattr(API_Spring, '_secret_cache_warned', False)
+    api = API_Spring('hml')
+
+    api.get_logins(cliente_id=10)
+    api.get_logins(cliente_id=10)
+    assert len(cached_server.gets) == 2
+    assert capsys.readouterr().out.count('Cache dos logins desativado') == 1
+
+
+def test_logins_cached_encrypted(cached_server, monkeypatch, tmp_path):
+    fernet = pytest.importorskip('cryptography.fernet')
+    monkeypatch.setenv('API_SPRING_CACHE_KEY', fernet.Fernet.generate_key().decode())
+    api = API_Spring('hml')
+
+    first = api.get_logins(cliente_id=10)
+    assert api.get_logins(cliente_id=10) == first
+    assert len(cached_server.gets) == 1
+    # Inclui o -wal do SQLite, onde ficam as escritas recentes
+    for path in tmp_path.glob('api_cache.sqlite*'):
+        assert b'SEGREDO' not in path.read_bytes()
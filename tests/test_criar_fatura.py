@@ -0,0 +1,209 @@
+import math
+import re
+from datetime import datetime as dt
+
+import pandas as pd
+
+from functions import criar_fatura, indexar_contas, tratar_df
+from Objects.Obj_ApiSpringBase import BaseClient, BaseInvoice
+from Objects.Obj_Invoice import Invoice, invoices_dataframe
+from Objects.Obj_Schema import MESREF_FORMAT, apply_detail_schema
+from Objects.Obj_UploadFatura import FaturaInfo
+
+# Preenchidos no momento da criação, diferentes entre as duas versões
+HORARIOS = ('DownloadArquivo', 'DownloadArquivoCliente')
+
+
+def conta(numero: str, conta_id: int, classe: int = None) -> BaseInvoice:
+    return BaseInvoice({'numeroConta': numero, 'contaId': conta_id, 'clienteId': 10,
+                        'fornecedorId': 1, 'fornecedorClasseId': classe,
+                        'tipoContaId': 2, 'unidadeId': 3})
+
+
+def make_login() -> BaseClient:
+    login = BaseClient({'login': 'user', 'senha': 'x', 'fornecedorClasseId': 7})
+    login.contas = [conta('123-4', 1, classe=5), conta('5678', 2), conta('9012', 3)]
+    return login
+
+
+def invoice(conta: str, fatura: str, valor: str, emissao: str, vencimento: str | None,
+            mesref: str, periodo: tuple[str, str], boleto: str | None) -> Invoice:
+    return Invoice(conta=conta, fatura=fatura, valor=valor, emissao=emissao,
+                   vencimento=vencimento, arquivo=f'{fatura}.pdf', mesref=mesref,
+                   inicio_periodo=periodo[0], fim_periodo=periodo[1], boleto=boleto,
+                   operadora='Oi', path='/faturas',
+                   full_path_file_pdf=f'/faturas/{fatura}.pdf', tipo_leitura=1)
+
+
+INVOICES = [
+    invoice('123-4', '0011', '1.234,56', '01/02/2024', '10/02/2024', '2024-02',
+            ('01/01/2024', '31/01/2024'), '84600000001 2 34560000 0'),
+    # Período com o ano em dois dígitos, detalhamento em txt e sem boleto
+    invoice('5678', '0022', '99,90', '02/02/2024', '12/02/2024', '2024-02',
+            ('01/01/24', '31/01/24'), None),
+    # Vencimento não lido, o arquivo fica OI_None_
+    invoice('9012', '0033', '10,00', '03/02/2024', None, '2024-01',
+            ('01/12/2023', '31/12/2023'), '84600000002 3 34560000 0'),
+    # Sem detalhamento, descartada pelo tratar_df
+    invoice('9012', '0044', '5,00', '04/02/2024', '14/02/2024', '2024-02',
+            ('01/01/2024', '31/01/2024'), None),
+]
+
+DETAILS = {
+    '11': ('det_0011.csv', 100.5),
+    '22': ('DET_0022.TXT', 99.9),
+    '33': ('det_0033.csv', 10.0),
+}
+
+
+def merged_frame() -> pd.DataFrame:
+    """The frame `leitor_detalhamento_oi` hands to `tratar_df`, one detail per invoice."""
+    df = invoices_dataframe(inv.as_tuple() for inv in INVOICES)
+    df.columns = df.columns.map(str.upper)
+    df['FATURA'] = df['FATURA'].str.lstrip('0')
+
+    details = pd.DataFrame(
+        [(fatura, name, f'/detalhes/{name}', valor) for fatura, (name, valor) in DETAILS.items()],
+        columns=['FATURA', 'FILE_DET', 'FULL_PATH_FILE_DET', 'VALOR'])
+    details = apply_detail_schema(details)
+
+    return details.merge(df, how='right', on='FATURA', suffixes=('_DET', '_PDF'))
+
+
+def legacy_criar_fatura(rows: list[dict], login: BaseClient) -> list[tuple[dict, list]]:
+    """The per-row `criar_fatura` before the vectorized version, with paths instead of open files."""
+    def formatar_data(data, input_format='%d/%m/%Y', output_format='%Y-%m-%d'):
+        if data is None or data == '' or data.lower() == 'none':
+            return None
+
+        return dt.strptime(data.lower(), input_format).strftime(output_format)
+
+    def limpar_texto(texto: str):
+        texto = re.sub(r'\s', '', texto)
+        texto = texto.replace('1ªVia', '')
+        texto = re.sub(r'[^A-Za-z0-9]+', '', texto)
+        return texto
+
+    faturas = []
+    for row in rows:
+        acc = next(c for c in login.contas
+                   if limpar_texto(row['CONTA']) == limpar_texto(c.numero_conta))
+
+        inv = FaturaInfo()
+        num_conta = limpar_texto(acc.numero_conta)
+        format_det = row['FILE_DET'].lower().split('.')[-1]
+
+        nome_arquivo_pdf = f'OI_{formatar_data(row["VENCIMENTO"], output_format="%d%m%y")}_{num_conta}.pdf'
+        nome_arquivo_digital = f'OI_{formatar_data(row["VENCIMENTO"], output_format="%d%m%y")}_{num_conta}.{format_det}'
+
+        try:
+            inv.CicloInicio = formatar_data(row['INICIO_PERIODO'], input_format='%d/%m/%Y')
+            inv.CicloFim = formatar_data(row['FIM_PERIODO'], input_format='%d/%m/%Y')
+        except ValueError:
+            inv.CicloInicio = formatar_data(row['INICIO_PERIODO'], input_format='%d/%m/%y')
+            inv.CicloFim = formatar_data(row['FIM_PERIODO'], input_format='%d/%m/%y')
+
+        inv.AnoReferencia = formatar_data(row['MESREF'], input_format='%b-%Y', output_format='%Y')
+        inv.ArquivoAzurePdf = nome_arquivo_pdf
+        inv.ArquivoAzureDigital = nome_arquivo_digital
+        inv.CodigoBarra = row['BOLETO']
+        inv.ContaId = acc.conta_id
+        inv.ClienteId = acc.cliente_id
+        inv.Emissao = formatar_data(row['EMISSAO'])
+        inv.FornecedorClasseId = acc.fornecedor_classe_id if acc.fornecedor_classe_id else login.fornecedor_classe_id
+        inv.FornecedorId = acc.fornecedor_id
+        inv.LoginId = 1
+        inv.MesReferencia = formatar_data(row['MESREF'], input_format='%b-%Y', output_format='%m')
+        inv.NomeArquivoDigital = nome_arquivo_digital
+        inv.NomeArquivoPdf = nome_arquivo_pdf
+        inv.NumeroConta = acc.numero_conta
+        inv.ValorDocumentoDigital = row['VALOR_DET']
+        inv.ValorDocumentoPDF = row['VALOR_PDF']
+        inv.Vencimento = formatar_data(row['VENCIMENTO'])
+        inv.Status = 'PENDENTE'
+        inv.TipoContaId = acc.tipo_conta_id
+        inv.UnidadeId = acc.unidade_id
+
+        type_det = 'text/plain' if format_det == 'txt' else 'text/csv'
+        files = [(nome_arquivo_pdf, row['FULL_PATH_FILE_PDF'], 'application/pdf'),
+                 (nome_arquivo_digital, row['FULL_PATH_FILE_DET'], type_det)]
+
+        faturas.append((inv.__dict__, files))
+
+    return faturas
+
+
+def legacy_rows() -> list[dict]:
+    """The text rows the per-row version received, for the invoices with detail."""
+    rows = []
+    for inv in INVOICES:
+        detail = DETAILS.get(inv.fatura.lstrip('0'))
+        if detail is None:
+            continue
+
+        name, valor = detail
+        mesref = dt.strptime(inv.mesref, MESREF_FORMAT).strftime('%b-%Y').lower()
+        rows.append({
+            'CONTA': inv.conta, 'VENCIMENTO': inv.vencimento, 'EMISSAO': inv.emissao,
+            'INICIO_PERIODO': inv.inicio_periodo, 'FIM_PERIODO': inv.fim_periodo,
+            'MESREF': mesref, 'FILE_DET': name, 'FULL_PATH_FILE_DET': f'/detalhes/{name}',
+            'FULL_PATH_FILE_PDF': inv.full_path_file_pdf, 'VALOR_DET': valor,
+            'VALOR_PDF': float(inv.valor.replace('.', '').replace(',', '.')),
+            # O boleto não lido chegava como NaN
+            'BOLETO': inv.boleto if inv.boleto else math.nan,
+        })
+    return rows
+
+
+def payload(info: dict) -> dict:
+    # NaN vai como null no JSON, igual ao None da versão nova
+    return {key: (None if isinstance(value, float) and math.isnan(value) else value)
+            for key, value in info.items() if key not in HORARIOS}
+
+
+def test_criar_fatura_matches_per_row_version():
+    login = make_login()
+
+    faturas = criar_fatura(tratar_df(merged_frame()), login)
+    legacy = legacy_criar_fatura(legacy_rows(), login)
+
+    new = {inv.NumeroConta: (payload(inv.__dict__), files) for inv, files in faturas}
+    old = {info['NumeroConta']: (payload(info), files) for info, files in legacy}
+    assert new == old
+
+
+def test_criar_fatura_edge_cases():
+    faturas = {inv.NumeroConta: (inv, files)
+               for inv, files in criar_fatura(tratar_df(merged_frame()), make_login())}
+
+    assert sorted(faturas) == ['123-4', '5678', '9012']
+
+    inv, files = faturas['5678']
+    assert (inv.CicloInicio, inv.CicloFim) == ('2024-01-01', '2024-01-31')
+    assert inv.CodigoBarra is None
+    assert files[1] == ('OI_120224_5678.txt', '/detalhes/DET_0022.TXT', 'text/plain')
+
+    inv, files = faturas['9012']
+    assert inv.Vencimento is None
+    assert [name for name, _, _ in files] == ['OI_None_9012.pdf', 'OI_None_9012.csv']
+
+    inv, _ = faturas['123-4']
+    assert (inv.AnoReferencia, inv.MesReferencia) == ('2024', '02')
+    assert (inv.ValorDocumentoPDF, inv.ValorDocumentoDigital) == (1234.56, 100.5)
+    assert inv.FornecedorClasseId == 5
+
+
+def test_indexar_contas_drops_ambiguous_accounts(capsys):
+    login = make_login()
+    # '12 34' fica igual a '123-4' depois de normalizado, mas é outra conta;
+    # a mesma conta repetida e a conta sem número não atrapalham
+    login.contas += [conta('12 34', 4), conta('5678', 2), conta(None, 6)]
+
+    contas = indexar_contas(login)
+
+    assert sorted(contas) == ['5678', '9012']
+    assert capsys.readouterr().out.count('Conta 1234 ambígua') == 1
+
+    # A fatura da conta ambígua não é enviada para nenhuma das duas
+    faturas = criar_fatura(tratar_df(merged_frame()), login)
+    assert sorted(inv.NumeroConta for inv, _ in faturas) == ['5678', '9012']
@@ -0,0 +1,80 @@
+import pytest
+
+from Objects import Obj_DiskCache
+from Objects.Obj_DiskCache import DiskCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(Obj_DiskCache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / 'sub' / 'cache.sqlite'), max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_stats(cache):
+    cache.set('a', {'valor': [1, 2.5, 'três']})
+
+    assert cache.get('a') == {'valor': [1, 2.5, 'três']}
+    assert cache.get('b') is None
+    assert cache.stats() == '1 acerto(s), 1 falha(s)'
+
+
+def test_max_age(cache, clock):
+    cache.set('a', 1)
+    clock.now += 60
+
+    assert cache.get('a', max_age=60) == 1
+    assert cache.get('a', max_age=59) is None
+    assert cache.get('a') == 1
+
+
+def test_evicts_least_recently_used(cache, clock):
+    value = 'x' * 298  # 300 bytes em JSON
+    for key in ('a', 'b', 'c'):
+        cache.set(key, value)
+        clock.now += 1
+
+    assert cache.get('a') == value  # 'b' passa a ser o menos usado
+    clock.now += 1
+    cache.set('d', value)
+
+    assert cache.get('b') is None
+    assert all(cache.get(key) == value for key in ('a', 'c', 'd'))
+
+
+def test_persists_between_instances(tmp_path, clock):
+    path = str(tmp_path / 'cache.sqlite')
+    first = DiskCache(path)
+    first.set('a', 1)
+    first.close()
+
+    second = DiskCache(path)
+    assert second.get('a') == 1
+    second.close()
+
+
+def test_stale_entry_returned_for_revalidation(cache, clock):
+    cache.set('a', 1)
+    clock.now += 120
+
+    assert cache.get_entry('a', max_age=60) == (1, False)
+    assert cache.get_entry('b', max_age=60) is None
+
+    cache.touch('a')
+    assert cache.get_entry('a', max_age=60) == (1, True)
+    assert cache.stats() == '1 acerto(s), 2 falha(s)'
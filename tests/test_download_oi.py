@@ -0,0 +1,73 @@
+import pytest
+
+from Automations import Download_OI_Files
+from Automations.Download_OI_Files import _select_page
+from Objects.Obj_WebAutomation import TimeoutException
+
+
+class SlowCheckbox:
+    """Header checkbox whose state only shows up some reads after the click."""
+
+    def __init__(self, delay: int) -> None:
+        self.checked = False
+        self.delay = delay
+        self.reads = 0
+
+    def is_selected(self) -> bool:
+        self.reads += 1
+        return self.checked and self.reads > self.delay
+
+
+class FakeDriver:
+    def __init__(self, checkbox: SlowCheckbox, click_errors: int = 0) -> None:
+        self.checkbox = checkbox
+        self.click_errors = click_errors
+        self.clicks = 0
+
+    def find_by_element(self, webdriver, x_path: str, wait=None) -> SlowCheckbox:
+        return self.checkbox
+
+    def click_by_element(self, webdriver, x_path: str, wait=None) -> SlowCheckbox:
+        if self.click_errors:
+            self.click_errors -= 1
+            raise RuntimeError('element click intercepted')
+
+        self.clicks += 1
+        self.checkbox.checked = not self.checkbox.checked
+        self.checkbox.reads = 0
+        return self.checkbox
+
+    def wait_until(self, webdriver, condition, timeout: float = 30, label: str = ''):
+        if not condition(webdriver):
+            raise TimeoutException(label)
+        return True
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(Download_OI_Files, 'sleep', lambda _: None)
+
+
+def test_slow_checkbox_is_not_clicked_again():
+    driver = FakeDriver(SlowCheckbox(delay=1))
+
+    _select_page(driver, None)
+
+    assert driver.clicks == 1
+    assert driver.checkbox.checked
+
+
+def test_click_errors_are_retried():
+    driver = FakeDriver(SlowCheckbox(delay=0), click_errors=1)
+
+    _select_page(driver, None)
+
+    assert driver.clicks == 1
+    assert driver.checkbox.checked
+
+
+def test_gives_up_after_tries():
+    driver = FakeDriver(SlowCheckbox(delay=0), click_errors=5)
+
+    with pytest.raises(TimeoutError):
+        _select_page(driver, None, tries=3)
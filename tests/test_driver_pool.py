@@ -0,0 +1,117 @@
+import pytest
+
+from Objects.Obj_WebAutomation import DriverPool, _PooledBrowser
+
+
+class FakeDriver:
+    pass
+
+
+class FakeWebDriver:
+    def __init__(self) -> None:
+        self.window_handles = ['main', 'popup']
+        self.cdp = []
+        self.quit_called = False
+        self.switch_to = self
+
+    def window(self, handle: str) -> None:
+        self.current = handle
+
+    def close(self) -> None:
+        self.window_handles.remove(self.current)
+
+    def get(self, url: str) -> None:
+        self.url = url
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        if cmd == 'Storage.clearDataForOrigin' and not params['origin'].startswith('https://'):
+            raise ValueError(f'Invalid origin: {params["origin"]}')
+        self.cdp.append((cmd, params))
+        return {}
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+def make_pool(tmp_path, **kwargs) -> tuple[DriverPool, list]:
+    launched = []
+
+    def launch():
+        browser = _PooledBrowser(FakeDriver(), FakeWebDriver())
+        launched.append(browser)
+        return browser
+
+    pool = DriverPool(str(tmp_path), clear_origins=['https://portal.example.com'], **kwargs)
+    pool._launch = launch
+    return pool, launched
+
+
+def test_leased_browser_returns_to_pool(tmp_path):
+    pool, launched = make_pool(tmp_path)
+
+    with pool.lease(str(tmp_path)) as (_, first):
+        pass
+    with pool.lease(str(tmp_path)) as (_, second):
+        pass
+
+    assert first is second
+    assert len(launched) == 1
+    assert not first.quit_called
+
+
+def test_reset_clears_portal_origins(tmp_path):
+    pool, _ = make_pool(tmp_path)
+
+    with pool.lease(str(tmp_path)) as (_, webdriver):
+        webdriver.cdp.clear()
+
+    commands = [cmd for cmd, _ in webdriver.cdp]
+    assert 'Network.clearBrowserCookies' in commands
+    assert 'Network.clearBrowserCache' in commands
+    assert ('Storage.clearDataForOrigin',
+            {'origin': 'https://portal.example.com', 'storageTypes': 'all'}) in webdriver.cdp
+    assert webdriver.window_handles == ['main']
+    assert webdriver.url == 'about:blank'
+
+
+def test_browser_recycled_after_max_uses(tmp_path):
+    pool, launched = make_pool(tmp_path, max_uses=1)
+
+    with pool.lease(str(tmp_path)) as (_, first):
+        pass
+    with pool.lease(str(tmp_path)) as (_, second):
+        pass
+
+    assert first is not second
+    assert first.quit_called
+    assert launched[1].webdriver is second
+
+
+def test_failed_warm_does_not_block_next_lease(tmp_path):
+    pool, launched = make_pool(tmp_path)
+    launch = pool._launch
+
+    def broken_launch():
+        raise RuntimeError('Chrome não iniciou')
+
+    pool._launch = broken_launch
+    with pytest.raises(RuntimeError):
+        pool.warm()
+
+    pool._launch = launch
+    with pool.lease(str(tmp_path)) as (_, webdriver):
+        pass
+
+    assert launched[0].webdriver is webdriver
+
+
+def test_recycled_browser_replaced_on_next_lease(tmp_path):
+    pool, launched = make_pool(tmp_path, max_uses=1)
+
+    with pool.lease(str(tmp_path)):
+        pass
+    assert len(launched) == 1
+
+    with pool.lease(str(tmp_path)):
+        pass
+    assert len(launched) == 2
@@ -0,0 +1,57 @@
+from datetime import datetime as dt
+
+import pytest
+
+from Benchmarks.bench_field_extractor import (_detail_page, legacy_format_2,
+                                              legacy_format_3)
+from Objects.Obj_Invoice import Invoice
+from Readers.Leitor_Boleto_OI import FORMAT_2, FORMAT_3
+
+# Meses no locale atual, como o leitor os interpreta
+FEVEREIRO = dt(2024, 2, 1)
+
+HEADER_2 = ("Contrato Agrupador: 99887766\nData de emissão: 03/02/2024\n"
+            f"Referência\n{FEVEREIRO.strftime('%B/%Y')}\nFatura: 555\nValor a pagar\n88,90\n"
+            "Data de Vencimento\n15/02/2024\n")
+
+HEADER_3 = ("CHEGOU SUA FATURA DA OI\nEmissão em 01/02/2024\nFATURA DE\nx\n"
+            f"{FEVEREIRO.strftime('%b/%Y')}\nNÚMERO DO CLIENTE: 123\nNÚMERO DA FATURA: 0099\n"
+            "TOTAL A\nPAGAR (R$)\n1.234,56\nVENCIMENTO\nx\n10/02/2024\n")
+
+DETAIL = '\n'.join(_detail_page(p) for p in range(3))
+
+CASES = [
+    (legacy_format_2, FORMAT_2, HEADER_2),
+    (legacy_format_2, FORMAT_2, DETAIL + '\n' + HEADER_2),
+    (legacy_format_2, FORMAT_2, HEADER_2 + HEADER_2.replace('555', '777')),
+    (legacy_format_2, FORMAT_2, HEADER_2.replace('Fatura: 555\n', '') + DETAIL),
+    (legacy_format_3, FORMAT_3, HEADER_3),
+    (legacy_format_3, FORMAT_3, DETAIL + '\n' + HEADER_3),
+    (legacy_format_3, FORMAT_3, HEADER_3.replace('NÚMERO DA FATURA: 0099\n', '')),
+]
+
+
+@pytest.mark.parametrize('legacy, extractor, text', CASES)
+def test_same_fields_as_legacy_loop(legacy, extractor, text):
+    old, new = Invoice(), Invoice()
+    legacy(text, old)
+    extractor.extract(text, new)
+
+    assert new.as_tuple() == old.as_tuple()
+
+
+def test_first_occurrence_wins():
+    invoice = Invoice()
+    FORMAT_2.extract(HEADER_2 + HEADER_2.replace('555', '777'), invoice)
+
+    assert invoice.fatura == '555'
+    assert invoice.mesref == '2024-02'
+
+
+def test_filled_fields_are_kept():
+    invoice = Invoice()
+    invoice.fatura = 'já lida'
+    FORMAT_3.extract(HEADER_3, invoice)
+
+    assert invoice.fatura == 'já lida'
+    assert invoice.conta == '123'
@@ -0,0 +1,60 @@
+import os
+from zipfile import ZipFile
+
+import pytest
+
+from Objects.Obj_FileSource import (file_size, iter_files, member_path, open_file,
+                                    read_bytes, resolve_source, split_path)
+
+FILES = {'b.pdf': b'%PDF-b' * 100, 'a.pdf': b'%PDF-a', 'sub/c.csv': b'FATURA;VALOR\n'}
+
+
+@pytest.fixture
+def sources(tmp_path):
+    folder = tmp_path / 'PDF'
+    (folder / 'sub').mkdir(parents=True)
+    for name, data in FILES.items():
+        (folder / name).write_bytes(data)
+
+    zip_path = tmp_path / 'PDF.zip'
+    with ZipFile(zip_path, 'w') as zf:
+        for name, data in FILES.items():
+            zf.writestr(name, data)
+    return str(folder), str(zip_path)
+
+
+def test_split_path_round_trip():
+    assert split_path(member_path('/x/PDF.zip', 'a::b.pdf')) == ('/x/PDF.zip', 'a::b.pdf')
+    assert split_path('/x/a.pdf') == ('/x/a.pdf', None)
+
+
+def test_zip_members_listed_in_name_order(sources):
+    _, zip_path = sources
+
+    assert list(iter_files(zip_path)) == [
+        (name, member_path(zip_path, name)) for name in sorted(FILES)]
+
+
+def test_folder_skips_subfolders(sources):
+    folder, _ = sources
+
+    assert [name for name, _ in iter_files(folder)] == ['a.pdf', 'b.pdf']
+
+
+def test_zip_members_read_like_files(sources):
+    folder, zip_path = sources
+
+    for name, full_path in iter_files(zip_path):
+        assert read_bytes(full_path) == FILES[name]
+        assert file_size(full_path) == len(FILES[name])
+        with open_file(full_path) as f:
+            assert f.read(4) == FILES[name][:4]
+
+    assert read_bytes(os.path.join(folder, 'a.pdf')) == FILES['a.pdf']
+
+
+def test_resolve_source_prefers_zip(sources, tmp_path):
+    _, zip_path = sources
+
+    assert resolve_source(str(tmp_path), 'PDF') == zip_path
+    assert resolve_source(str(tmp_path), 'CSV') == str(tmp_path / 'CSV')
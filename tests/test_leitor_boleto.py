@@ -0,0 +1,116 @@
+import re
+from datetime import datetime as dt
+
+import fitz
+import pytest
+
+from Objects.Obj_Invoice import INVOICE_COLUMNS, Invoice
+from Readers.Leitor_Boleto_OI import HEADER_PAGES, _extract_incremental, iter_boletos_oi
+
+BOLETO = '84600000001 2 34560000 0 12345678901 2 34567890123 4 '
+PERIODO = '01/01/2024 a 31/01/2024'
+
+FORMAT_2_PAGE = ('Contrato Agrupador: 555\nFatura: 0099\nData de emissão: 01/02/2024\n'
+                 'Valor a pagar\nR$ 10,00\nData de Vencimento\n10/02/2024')
+
+
+def extract(pages: list[str]) -> Invoice:
+    invoice = Invoice()
+    _extract_incremental(None, iter(pages), len(pages), invoice)
+    return invoice
+
+
+def full_text_boleto(pages: list[str]) -> str:
+    """The boleto as the reader found it on the whole text, before the incremental reading."""
+    found = re.findall(r'(?:\d{5,}[\s.-]?\d\s+){4}', '\n'.join(pages))
+    return ' '.join(found[0].split('\n')[0].split(' '))
+
+
+def test_format_2_marker_on_header_page_wins_over_format_1():
+    pages = [f'TELEFONE/CONTRATO\nCHEGOU SUA FATURA DA OI\n{BOLETO}\n{PERIODO}',
+             FORMAT_2_PAGE,
+             'página sem marcadores']
+
+    assert extract(pages).tipo_leitura == 2
+
+
+def test_format_2_marker_after_header_is_ignored():
+    pages = [f'TELEFONE/CONTRATO\n{BOLETO}\n{PERIODO}',
+             'página sem marcadores',
+             FORMAT_2_PAGE]
+
+    assert extract(pages).tipo_leitura == 1
+
+
+def test_format_1_stops_reading_after_header():
+    first = ('DATA DE EMISSAO\n01/02/2024\nTELEFONE/CONTRATO:\n1234567\n'
+             'FATURA N 0099\nVALOR A PAGAR\nR$ 10,00\nVENCIMENTO: 10/02/2024\n'
+             f'CODIGO DDD\n21\n{BOLETO}\n{PERIODO}')
+    pages = [first] + [f'detalhe {n}' for n in range(1, 6)]
+    pulled = []
+
+    def tracked():
+        for n, page in enumerate(pages):
+            pulled.append(n)
+            yield page
+
+    invoice = Invoice()
+    _extract_incremental(None, tracked(), len(pages), invoice)
+
+    assert invoice.tipo_leitura == 1
+    assert (invoice.conta, invoice.fatura, invoice.valor) == ('1234567', '0099', '10,00')
+    assert pulled == list(range(HEADER_PAGES))
+
+
+def test_format_1_wins_over_format_3_markers_on_earlier_page():
+    pages = [f'CHEGOU SUA FATURA DA OI\n{BOLETO}\n{PERIODO}',
+             'PLANO LOCAL']
+
+    assert extract(pages).tipo_leitura == 1
+
+
+def test_format_3_decided_on_last_page():
+    pages = [f'EMPRESAS\n{BOLETO}', PERIODO]
+
+    invoice = extract(pages)
+    assert invoice.tipo_leitura == 3
+    assert (invoice.inicio_periodo, invoice.fim_periodo) == ('01/01/2024', '31/01/2024')
+
+
+def test_unknown_layout_raises():
+    with pytest.raises(TypeError):
+        extract([BOLETO, 'nada'])
+
+
+@pytest.mark.parametrize('pages', [
+    ['CHEGOU SUA FATURA DA OI', f'texto {BOLETO}'],
+    ['CHEGOU SUA FATURA DA OI\n84600000001 2 34560000 0', '12345678901 2 34567890123 4 \nfim'],
+    ['CHEGOU SUA FATURA DA OI\n84600000001 2', '34560000 0\n12345678901 2\n34567890123 4 \nfim'],
+])
+def test_boleto_matches_whole_text_search(pages):
+    assert extract(pages).boleto == full_text_boleto(pages)
+
+
+def write_format_3_pdf(path, n: int) -> None:
+    # Mês abreviado no locale atual, como o leitor espera
+    mes = dt(2024, 2, 1).strftime('%b/%Y')
+    pages = [f'CHEGOU SUA FATURA DA OI\nEmissão em 01/02/2024\nFATURA DE\nx\n{mes}\n'
+             f'NÚMERO DO CLIENTE: 12{n}\nNÚMERO DA FATURA: 00{n}9\nTOTAL A\nPAGAR (R$)',
+             f'1.234,5{n}\nVENCIMENTO\nx\n1{n}/02/2024\n{BOLETO}\n{PERIODO}\n']
+
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((50, 50), text)
+    doc.save(path)
+
+
+def test_parallel_reading_matches_serial(tmp_path):
+    for n in range(4):
+        write_format_3_pdf(tmp_path / f'fatura_{n}.pdf', n)
+
+    serial = list(iter_boletos_oi(str(tmp_path), workers=1))
+    parallel = list(iter_boletos_oi(str(tmp_path), workers=2))
+
+    fatura = INVOICE_COLUMNS.index('fatura')
+    assert [record[fatura] for record in serial] == ['0009', '0019', '0029', '0039']
+    assert parallel == serial
@@ -0,0 +1,35 @@
+import pytest
+
+from Readers import Leitor_Detalhamentos_OI as det
+
+ROWS = ['FATURA;FONE-ORIG;VALOR;BLOCO',
+        '0099;1133334444;1,50;Serviço A',
+        '0099;1133334444;2,25;Serviço A',
+        '0100;1155556666;3,00;Serviço B',
+        '0100;;0,25;']
+
+
+@pytest.fixture(params=['utf-8', 'utf-8-sig'])
+def details_folder(request, tmp_path):
+    (tmp_path / 'detalhe.csv').write_text('\n'.join(ROWS) + '\n', encoding=request.param)
+    return tmp_path
+
+
+def test_header_without_bom(details_folder):
+    assert det._read_header(str(details_folder / 'detalhe.csv')) == ROWS[0].split(';')
+
+
+def test_layout_and_totals(details_folder):
+    path = str(details_folder / 'detalhe.csv')
+    assert det._select_layout('detalhe.csv', path).name == 'TXT'
+
+    df = det.read_files(str(details_folder))
+    totals = df.groupby('FATURA', observed=True)['VALOR'].sum()
+    assert totals.to_dict() == {'0099': pytest.approx(3.75), '0100': pytest.approx(3.25)}
+
+
+def test_chunked_reading_matches_whole_file(details_folder):
+    # Sem chunksize o arquivo é lido pelo pyarrow, quando instalado
+    whole = det.read_files(str(details_folder))
+    chunked = det.read_files(str(details_folder), chunksize=1)
+    assert whole.equals(chunked)
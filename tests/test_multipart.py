@@ -0,0 +1,70 @@
+from zipfile import ZipFile
+
+import pytest
+import requests as req
+
+from Objects.Obj_FileSource import member_path
+from Objects.Obj_Multipart import MultipartStream
+
+FIELDS = {'NumeroConta': '123', 'NomeArquivoPdf': 'fatura "1".pdf',
+          'ArquivoAzureDigital': None, 'ValorDocumentoPDF': 10.5}
+CONTENT = bytes(range(256)) * 50
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / 'fatura.pdf'
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def requests_body(boundary: str, pdf: str) -> bytes:
+    with open(pdf, 'rb') as f:
+        prepared = req.Request('POST', 'http://x', data=FIELDS,
+                               files={'files': ('fatura.pdf', f, 'application/pdf')}).prepare()
+    # Mesmo corpo, trocando só o boundary aleatório do requests
+    old = prepared.headers['Content-Type'].split('boundary=')[1]
+    return prepared.body.replace(old.encode(), boundary.encode())
+
+
+def test_same_body_as_requests(pdf):
+    body = MultipartStream(FIELDS, [('files', 'fatura.pdf', pdf, 'application/pdf')])
+
+    data = body.read()
+    assert data == requests_body(body.boundary, pdf)
+    assert len(body) == len(data) == body.tell()
+    assert body.content_type == f'multipart/form-data; boundary={body.boundary}'
+
+
+def test_small_reads_and_rewind(pdf):
+    with MultipartStream(FIELDS, [('files', 'fatura.pdf', pdf, 'application/pdf')]) as body:
+        whole = body.read()
+
+        assert body.seek(0) == 0
+        chunks = []
+        while chunk := body.read(1000):
+            chunks.append(chunk)
+
+    assert b''.join(chunks) == whole
+    assert max(len(chunk) for chunk in chunks) == 1000
+
+
+def test_zip_member(tmp_path):
+    zip_path = tmp_path / 'PDF.zip'
+    with ZipFile(zip_path, 'w') as zf:
+        zf.writestr('fatura.pdf', CONTENT)
+
+    body = MultipartStream({}, [('files', 'fatura.pdf', member_path(str(zip_path), 'fatura.pdf'),
+                                 'application/pdf')])
+
+    data = body.read()
+    assert len(data) == len(body)
+    assert CONTENT in data
+
+
+def test_only_rewind_is_supported(pdf):
+    body = MultipartStream(FIELDS, [('files', 'fatura.pdf', pdf, 'application/pdf')])
+    body.read(10)
+
+    with pytest.raises(OSError):
+        body.seek(5)
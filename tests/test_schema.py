@@ -0,0 +1,56 @@
+import pandas as pd
+
+from Objects.Obj_Schema import (MESREF_FORMAT, apply_detail_schema,
+                                apply_invoice_schema, parse_dates, parse_valor)
+
+
+def test_parse_dates_accepts_both_year_formats():
+    dates = parse_dates(pd.Series(['10/02/2024', ' 10/02/24 ', None, 'sem data'],
+                                  index=[5, 6, 7, 8]))
+
+    assert dates.dtype == 'datetime64[ns]'
+    assert list(dates.index) == [5, 6, 7, 8]
+    assert dates[5] == dates[6] == pd.Timestamp(2024, 2, 10)
+    assert dates[7:].isna().all()
+
+
+def test_parse_dates_mesref():
+    dates = parse_dates(pd.Series(['2024-02', '2024-13']), formats=(MESREF_FORMAT,))
+
+    assert dates[0] == pd.Timestamp(2024, 2, 1)
+    assert pd.isna(dates[1])
+
+
+def test_parse_valor():
+    valores = parse_valor(pd.Series(['R$ 1.234,56', '88,90', ' 1.000.000,00 ', '', None, 'x']))
+
+    assert valores.dtype == 'Float64'
+    assert valores[:3].tolist() == [1234.56, 88.9, 1_000_000.0]
+    assert valores[3:].isna().all()
+
+
+def test_apply_invoice_schema():
+    df = pd.DataFrame({
+        'conta': [' 123 ', '123'],
+        'valor': ['1,50', None],
+        'emissao': ['01/02/2024', None],
+        'mesref': ['2024-02', None],
+        'tipo_leitura': [3, None],
+        'arquivo': ['a.pdf', 'b.pdf'],
+    })
+
+    typed = apply_invoice_schema(df)
+
+    assert typed['conta'].dtype == 'category'
+    assert typed['conta'].cat.categories.tolist() == ['123']
+    assert typed['valor'].dtype == 'Float64'
+    assert typed['emissao'].dtype == typed['mesref'].dtype == 'datetime64[ns]'
+    assert typed['tipo_leitura'].dtype == 'Int8'
+    assert typed['arquivo'].tolist() == ['a.pdf', 'b.pdf']
+
+
+def test_apply_detail_schema_keeps_missing_columns_out():
+    df = apply_detail_schema(pd.DataFrame({'DESCRICAO': ['a', 'a'], 'VALOR': [1.0, 2.0]}))
+
+    assert df['DESCRICAO'].dtype == 'category'
+    assert df['VALOR'].dtype == 'float64'
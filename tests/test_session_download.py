@@ -0,0 +1,88 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests as req
+
+from Objects.Obj_SessionDownload import DirectDownloadError, stream_download
+
+CONTENT = b'PK' + bytes(range(256)) * 8
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, length: int) -> None:
+        self.status_code = 200
+        self.headers = {'Content-Type': 'application/zip', 'Content-Length': str(length)}
+        self.body = body
+
+    def __enter__(self) -> 'FakeResponse':
+        return self
+
+    def __exit__(self, *_) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeSession:
+    def __init__(self, response: FakeResponse) -> None:
+        self.response = response
+
+    def get(self, url: str, **kwargs) -> FakeResponse:
+        return self.response
+
+
+def test_complete_download_written_to_dest(tmp_path):
+    dest = tmp_path / 'PDF.zip'
+    session = FakeSession(FakeResponse(CONTENT, len(CONTENT)))
+
+    assert stream_download(session, 'https://x/PDF.zip', str(dest), chunk_size=100) == len(CONTENT)
+    assert dest.read_bytes() == CONTENT
+    assert not (tmp_path / 'PDF.zip.part').exists()
+
+
+def test_short_download_never_reaches_dest(tmp_path):
+    dest = tmp_path / 'PDF.zip'
+    session = FakeSession(FakeResponse(CONTENT[:500], len(CONTENT)))
+
+    with pytest.raises(DirectDownloadError, match='incompleto'):
+        stream_download(session, 'https://x/PDF.zip', str(dest), chunk_size=100)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_short_download_to_buffer_raises():
+    session = FakeSession(FakeResponse(CONTENT[:500], len(CONTENT)))
+
+    with pytest.raises(DirectDownloadError):
+        stream_download(session, 'https://x/PDF.zip', io.BytesIO())
+
+
+class TruncatingHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Length', str(len(CONTENT)))
+        self.end_headers()
+        self.wfile.write(CONTENT[:500])
+        self.close_connection = True
+
+
+def test_connection_closed_mid_download_leaves_no_file(tmp_path):
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), TruncatingHandler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    dest = tmp_path / 'PDF.zip'
+    try:
+        with req.Session() as session, \
+                pytest.raises((DirectDownloadError, req.exceptions.RequestException)):
+            stream_download(session, f'http://127.0.0.1:{srv.server_port}/PDF.zip', str(dest))
+    finally:
+        srv.shutdown()
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,122 @@
+import base64
+import json
+import os
+import stat
+import threading
+from time import sleep
+
+import pytest
+
+from Objects import Obj_TokenManager
+from Objects.Obj_TokenManager import TokenManager, token_expiry
+
+
+def jwt(exp: float, n: int = 0) -> str:
+    def part(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+    return f'Bearer {part({"alg": "none"})}.{part({"exp": exp, "n": n})}.assinatura'
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(Obj_TokenManager, 'time', clock)
+    return clock
+
+
+class Login:
+    """Emite tokens com validade de `ttl` segundos, contando os logins"""
+
+    def __init__(self, clock: Clock, ttl: float = 3600, delay: float = 0) -> None:
+        self.clock = clock
+        self.ttl = ttl
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        sleep(self.delay)
+        return jwt(self.clock.now + self.ttl, self.calls)
+
+
+def test_token_expiry():
+    assert token_expiry(jwt(1234.0)) == 1234.0
+    assert token_expiry('Bearer opaco') is None
+    assert token_expiry('Bearer a.bm9uLWpzb24.c') is None
+
+
+def test_reused_until_margin(clock):
+    login = Login(clock, ttl=600)
+    manager = TokenManager(login, margin=60)
+
+    token = manager.get()
+    clock.now += 539
+    assert manager.get() == token
+
+    clock.now += 1
+    assert manager.get() != token
+    assert login.calls == 2
+
+
+def test_opaque_token_uses_default_ttl(clock):
+    manager = TokenManager(lambda: 'Bearer opaco', margin=60, default_ttl=600)
+
+    manager.get()
+    assert manager._expires == clock.now + 600
+
+
+def test_single_refresh_under_concurrency(clock):
+    login = Login(clock, delay=0.1)
+    manager = TokenManager(login)
+
+    threads = [threading.Thread(target=manager.get) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert login.calls == 1
+
+
+def test_invalidate_only_current_token(clock):
+    login = Login(clock)
+    manager = TokenManager(login)
+
+    old = manager.get()
+    manager.invalidate(old)
+    new = manager.get()
+    assert new != old
+
+    # Um 401 atrasado do token antigo não descarta o novo
+    manager.invalidate(old)
+    assert manager.get() == new
+    assert login.calls == 2
+
+
+def test_persisted_between_managers(clock, tmp_path):
+    path = str(tmp_path / 'token.json')
+    login = Login(clock)
+
+    token = TokenManager(login, path).get()
+    assert TokenManager(login, path).get() == token
+    assert login.calls == 1
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_invalidate_removes_persisted_token(clock, tmp_path):
+    path = str(tmp_path / 'token.json')
+    login = Login(clock)
+    manager = TokenManager(login, path)
+
+    manager.invalidate(manager.get())
+    assert not os.path.exists(path)
+    assert TokenManager(login, path).get() != jwt(clock.now + 3600, 1)
+    assert login.calls == 2
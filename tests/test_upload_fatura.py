@@ -0,0 +1,62 @@
+import pytest
+
+import functions
+from Objects.Obj_ApiSpring import UploadError
+from Objects.Obj_UploadFatura import FaturaInfo
+
+
+class FakeApi:
+    """Falha o envio das contas em `failing` e registra as enviadas"""
+    sent: list = []
+    failing: set = set()
+
+    def __init__(self, ambient: str) -> None:
+        pass
+
+    def up_invoices(self, invoices: list) -> list[dict]:
+        results = []
+        for payload, _ in invoices:
+            FakeApi.sent.append(payload['NumeroConta'])
+            ok = payload['NumeroConta'] not in FakeApi.failing
+            results.append({'conta': payload['NumeroConta'], 'arquivo': payload['NomeArquivoPdf'],
+                            'status': 'success' if ok else 'error',
+                            'error': None if ok else 'HTTPError: 500', 'elapsed': 0.0})
+        return results
+
+
+def fatura(conta: str) -> tuple[FaturaInfo, list]:
+    info = FaturaInfo()
+    info.NumeroConta = conta
+    info.Vencimento = '2024-02-10'
+    info.NomeArquivoPdf = f'fatura_{conta}.pdf'
+    return info, []
+
+
+@pytest.fixture(autouse=True)
+def fake_api(monkeypatch):
+    monkeypatch.setattr(functions, 'API_Spring', FakeApi)
+    FakeApi.sent = []
+    FakeApi.failing = set()
+
+
+def test_retry_sends_only_failed_invoices():
+    faturas = [fatura('1'), fatura('2'), fatura('3')]
+    enviadas = set()
+
+    FakeApi.failing = {'2'}
+    with pytest.raises(UploadError, match='1 de 3'):
+        functions.upload_fatura(faturas, enviadas)
+
+    FakeApi.failing = set()
+    FakeApi.sent = []
+    results = functions.upload_fatura(faturas, enviadas)
+
+    assert FakeApi.sent == ['2']
+    assert [r['conta'] for r in results] == ['2']
+    assert len(enviadas) == 3
+
+
+def test_without_previous_attempts_sends_everything():
+    functions.upload_fatura([fatura('1'), fatura('2')])
+
+    assert FakeApi.sent == ['1', '2']